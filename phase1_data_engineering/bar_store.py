@@ -0,0 +1,142 @@
+import json
+import os
+import pickle
+
+import pandas as pd
+
+# How far back each yfinance `period` reaches
+PERIOD_OFFSETS = {
+    '1d': pd.DateOffset(days=1),
+    '5d': pd.DateOffset(days=5),
+    '1mo': pd.DateOffset(months=1),
+    '3mo': pd.DateOffset(months=3),
+    '6mo': pd.DateOffset(months=6),
+    '1y': pd.DateOffset(years=1),
+    '2y': pd.DateOffset(years=2),
+    '5y': pd.DateOffset(years=5),
+    '10y': pd.DateOffset(years=10),
+}
+
+# Length of one bar for each yfinance `interval`
+INTERVAL_LENGTHS = {
+    '1m': pd.Timedelta(minutes=1),
+    '2m': pd.Timedelta(minutes=2),
+    '5m': pd.Timedelta(minutes=5),
+    '15m': pd.Timedelta(minutes=15),
+    '30m': pd.Timedelta(minutes=30),
+    '60m': pd.Timedelta(hours=1),
+    '90m': pd.Timedelta(minutes=90),
+    '1h': pd.Timedelta(hours=1),
+    '1d': pd.Timedelta(days=1),
+    '5d': pd.Timedelta(days=5),
+    '1wk': pd.Timedelta(weeks=1),
+    '1mo': pd.Timedelta(days=30),
+    '3mo': pd.Timedelta(days=90),
+}
+
+
+def _now_like(index):
+    """Current time in the same timezone (or lack of one) as `index`."""
+    now = pd.Timestamp.now(tz='UTC')
+    if index.tz is None:
+        return now.tz_localize(None)
+    return now.tz_convert(index.tz)
+
+
+def period_start(period, index):
+    """First timestamp covered by `period`, or None for 'max'."""
+    if period == 'max':
+        return None
+    now = _now_like(index)
+    if period == 'ytd':
+        return now.normalize().replace(month=1, day=1)
+    return now - PERIOD_OFFSETS[period]
+
+
+def flatten_columns(df):
+    """Drop the ticker level yfinance adds to single-symbol downloads."""
+    if isinstance(df.columns, pd.MultiIndex):
+        df = df.copy()
+        df.columns = df.columns.get_level_values(0)
+    return df
+
+
+class BarStore:
+    """On-disk OHLCV cache keyed by (symbol, interval).
+
+    Bars are kept as one pickle per key so dtypes and timezones survive a
+    round trip. A sidecar JSON records how far back the cache was filled, so
+    a later request for a longer period still triggers a full download.
+    """
+
+    def __init__(self, root='bar_cache', verbose=False):
+        self.root = root
+        self.verbose = verbose
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, symbol, interval, ext):
+        return os.path.join(self.root, f"{symbol}_{interval}.{ext}")
+
+    def load(self, symbol, interval):
+        """(bars, meta) from disk, or (None, None) if either file is missing or unreadable."""
+        try:
+            with open(self._path(symbol, interval, 'json'), 'r') as f:
+                meta = json.load(f)
+            return pd.read_pickle(self._path(symbol, interval, 'pkl')), meta
+        except (OSError, ValueError, EOFError, pickle.UnpicklingError):
+            return None, None
+
+    def save(self, symbol, interval, df, meta):
+        # Write to temp files first so a crash never leaves a half-written cache
+        path = self._path(symbol, interval, 'pkl')
+        meta_path = self._path(symbol, interval, 'json')
+        df.to_pickle(path + '.tmp')
+        with open(meta_path + '.tmp', 'w') as f:
+            json.dump(meta, f)
+        os.replace(path + '.tmp', path)
+        os.replace(meta_path + '.tmp', meta_path)
+
+    def _covers(self, cached, meta, period):
+        if 'covered_from' not in meta:
+            return False
+        if meta.get('period') == 'max':
+            return True
+        if period == 'max':
+            return False
+        return pd.Timestamp(meta['covered_from']) <= period_start(period, cached.index)
+
+    def get(self, symbol, period, interval, download):
+        """Return bars for `period`, fetching only what the cache is missing.
+
+        `download` is called like `yf.download` (keyword `period=` or `start=`
+        plus `interval=`) and must return a DataFrame indexed by timestamp.
+        """
+        cached, meta = self.load(symbol, interval)
+
+        if cached is None or cached.empty or not self._covers(cached, meta, period):
+            df = flatten_columns(download(symbol, period=period, interval=interval))
+            if df.empty:
+                return df
+            start = period_start(period, df.index)
+            meta = {
+                'period': period,
+                'covered_from': (start if start is not None else df.index[0]).isoformat(),
+            }
+            self.save(symbol, interval, df, meta)
+            return df if start is None else df[df.index >= start]
+
+        last = cached.index[-1]
+        if _now_like(cached.index) - last >= INTERVAL_LENGTHS[interval]:
+            # Refetch from the last stored bar; it may have been incomplete
+            tail = flatten_columns(download(symbol, start=last, interval=interval))
+            if not tail.empty:
+                cached = pd.concat([cached, tail])
+                cached = cached[~cached.index.duplicated(keep='last')].sort_index()
+                self.save(symbol, interval, cached, meta)
+                if self.verbose:
+                    print(f"{symbol}: merged {len(tail)} new bars into cache")
+
+        start = period_start(period, cached.index)
+        if start is None:
+            return cached
+        return cached[cached.index >= start]
@@ -1,34 +1,136 @@
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
+import pandas as pd
 import yfinance as yf
 
+from bar_store import flatten_columns
+
 class StockFetcher:
 
-    def __init__(self, symbol, period='1mo', interval='1h'):
+    def __init__(self, symbol, period='1mo', interval='1h', store=None, downloader=None):
         self.symbol = symbol
         self.period = period
         self.interval = interval
+        # Optional BarStore; when set only the missing tail is downloaded
+        self.store = store
+        # Anything with yf.download's signature, e.g. a stub for offline runs
+        self.downloader = downloader or yf.download
 
-    def get_data(self):
+    def _download(self, symbol, allow_empty=False, **kwargs):
         for attempt in range(3):
             try:
-                df = yf.download(
-                    self.symbol,
-                    period=self.period,
-                    interval=self.interval,
-                    progress=False
-                )
-                if not df.empty:
-                    break
+                df = self.downloader(symbol, progress=False, **kwargs)
+                if not df.empty or allow_empty:
+                    return df
             except Exception as e:
                 print(f"Attempt {attempt + 1} failed: {e}")
                 time.sleep(5)
+        raise SystemExit("No data returned. Check ticker/symbol and network.")
+
+    def get_data(self):
+        if self.store is not None:
+            df = self.store.get(
+                self.symbol, self.period, self.interval,
+                lambda symbol, **kw: self._download(symbol, allow_empty='start' in kw, **kw)
+            )
         else:
+            df = flatten_columns(self._download(self.symbol, period=self.period, interval=self.interval))
+        if df.empty:
             raise SystemExit("No data returned. Check ticker/symbol and network.")
-        
+
         # Save to CSV
         csv_name = f"{self.symbol}_yfinance.csv"
         df.to_csv(csv_name)
         print(f"Saved {len(df)} rows to {csv_name}")
-        
+
         return df
+
+
+class BatchResult:
+    """Per-symbol outcome of a batch download."""
+
+    def __init__(self):
+        self.frames = {}   # symbol -> OHLCV DataFrame
+        self.errors = {}   # symbol -> error message
+
+    def to_long(self):
+        """Tidy frame with one row per (symbol, timestamp)."""
+        if not self.frames:
+            return pd.DataFrame()
+        long_df = pd.concat(self.frames, names=['Symbol', 'Date'])
+        return long_df.reset_index()
+
+
+def _split_group(df, group):
+    """Split a grouped yf.download result into one frame per symbol."""
+    frames = {}
+    if df is None or df.empty:
+        return frames
+    if not isinstance(df.columns, pd.MultiIndex):
+        # A group of one comes back without the ticker level
+        return {group[0]: df.dropna(how='all')} if len(group) == 1 else frames
+    tickers = set(df.columns.get_level_values(0))
+    for symbol in group:
+        if symbol in tickers:
+            sub = df[symbol].dropna(how='all')
+            if not sub.empty:
+                frames[symbol] = sub
+    return frames
+
+
+def fetch_many(symbols, period='1mo', interval='1h', group_size=50, max_workers=8,
+               store=None, downloader=None):
+    """Download many symbols at once without stopping on a bad ticker.
+
+    Symbols are requested in groups of `group_size` per yf.download call;
+    any symbol a group did not return is retried on its own. With a BarStore
+    every symbol goes through the cache instead, since each one only needs
+    its own missing tail. All calls share a pool of `max_workers` threads.
+    """
+    downloader = downloader or yf.download
+    symbols = list(dict.fromkeys(s.strip().upper() for s in symbols if s.strip()))
+    result = BatchResult()
+
+    def fetch_one(symbol):
+        if store is not None:
+            return store.get(
+                symbol, period, interval,
+                lambda sym, **kw: downloader(sym, progress=False, **kw)
+            )
+        return flatten_columns(downloader(symbol, period=period, interval=interval, progress=False))
+
+    def fetch_group(group):
+        df = downloader(group, period=period, interval=interval, group_by='ticker',
+                        threads=False, progress=False)
+        return _split_group(df, group)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        leftovers = list(symbols)
+        if store is None:
+            groups = [symbols[i:i + group_size] for i in range(0, len(symbols), group_size)]
+            futures = {pool.submit(fetch_group, g): g for g in groups}
+            for future in as_completed(futures):
+                try:
+                    result.frames.update(future.result())
+                except Exception as e:
+                    print(f"Group download failed ({len(futures[future])} symbols): {e}")
+            leftovers = [s for s in symbols if s not in result.frames]
+
+        futures = {pool.submit(fetch_one, s): s for s in leftovers}
+        for future in as_completed(futures):
+            symbol = futures[future]
+            try:
+                df = future.result()
+            except Exception as e:
+                result.errors[symbol] = str(e)
+                continue
+            if df is None or df.empty:
+                result.errors[symbol] = "No data returned"
+            else:
+                result.frames[symbol] = df
+
+    # Keep the caller's ordering
+    result.frames = {s: result.frames[s] for s in symbols if s in result.frames}
+    print(f"Fetched {len(result.frames)}/{len(symbols)} symbols, {len(result.errors)} failed")
+    return result
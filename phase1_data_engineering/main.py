@@ -1,13 +1,18 @@
 from plotting import StockPlotter
+from bar_store import BarStore
+from fetch_data import fetch_many
 
 valid_intervals = ['1m', '2m', '5m', '15m', '30m', '60m', '90m', '1h', '1d', '5d', '1wk', '1mo', '3mo']
 valid_periods = ['1d', '5d', '1mo', '3mo', '6mo', '1y', '2y', '5y', '10y', 'ytd', 'max']
 
+# Bars are cached locally; reruns only download the bars added since last time
+store = BarStore('bar_cache')
+
 while True:
     try:
         period = input("Enter period: ").strip() or "1mo"
         interval = input("Enter interval: ").strip() or "1h"
-        symbol = input("Enter stock ticker symbol (e.g. AAPL, MSFT, RELIANCE.NS): ").strip().upper()
+        symbols = input("Enter stock ticker symbol(s) (e.g. AAPL MSFT RELIANCE.NS): ").strip().upper().split()
         
         # Validate
         if interval not in valid_intervals or period not in valid_periods:
@@ -15,10 +20,17 @@ while True:
             continue
         
         # Fetch and plot
-        plotter = StockPlotter(symbol, period, interval)
-        df = plotter.plotting()
-        
-        print(f"Fetched {len(df)} rows for {symbol}")
+        if len(symbols) == 1:
+            plotter = StockPlotter(symbols[0], period, interval, store=store)
+            df = plotter.plotting()
+            print(f"Fetched {len(df)} rows for {symbols[0]}")
+        else:
+            result = fetch_many(symbols, period, interval, store=store)
+            for symbol, df in result.frames.items():
+                print(f"Fetched {len(df)} rows for {symbol}")
+                StockPlotter(symbol, period, interval).plot(df)
+            for symbol, error in result.errors.items():
+                print(f"Failed to fetch {symbol}: {error}")
         break  # exit loop if successful
         
     except Exception as e:
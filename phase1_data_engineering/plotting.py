@@ -2,15 +2,18 @@ from fetch_data import StockFetcher
 import matplotlib.pyplot as plt
 
 class StockPlotter:
-    def __init__(self, symbol, period='1mo', interval='1h'):
+    def __init__(self, symbol, period='1mo', interval='1h', store=None):
         self.symbol = symbol
         self.period = period
         self.interval = interval
+        self.store = store
 
     def plotting(self):
-        fetcher = StockFetcher(self.symbol, self.period, self.interval)
+        fetcher = StockFetcher(self.symbol, self.period, self.interval, store=self.store)
         df = fetcher.get_data()
-        
+        return self.plot(df)
+
+    def plot(self, df):
         plt.figure(figsize=(10,5))
         plt.plot(df.index, df['Close'], linewidth=1.5)
         plt.title(f"{self.symbol} Closing Prices ({self.period}, {self.interval})", fontsize=12)
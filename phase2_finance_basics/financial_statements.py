@@ -1,5 +1,9 @@
 import yfinance as yf
 import matplotlib.pyplot as plt
+import pandas as pd
+
+import indicators
+from signals import crossover_signals, crosses_above, crosses_below
 
 class Technical_Indicators:
     def __init__(self, symbol, period = '6mo', window = 20):
@@ -8,23 +12,13 @@ class Technical_Indicators:
         self.window = window
 
     def rsi(self, data):
-        
-        # Calculate moving averages
-        data['Change'] = data['Close'].diff()  # yfinance actually returns 'Close' with capital C
-        data['Gain'] = data['Change'].where(data['Change'] > 0, 0)
-        data['Loss'] = -data['Change'].where(data['Change'] < 0, 0)
-        #Finding Avg
-        data['Avg_Gain'] = data['Gain'].ewm(span = self.window, adjust = False).mean()
-        data['Avg_Loss'] = data['Loss'].ewm(span = self.window, adjust = False).mean()
-        #Calculate RSI
-        data['RS'] = data['Avg_Gain'] / data['Avg_Loss'].replace(0, 1e-10)
-        data['RSI'] = 100 - (100 / (1 + data['RS']))
-        
-        # Extract first and last dates safely
-
-        data['Prev_RSI'] = data['RSI'].shift(1)
-        overbought_cross = data[(data['Prev_RSI'] < 70) & (data['RSI'] >= 70)]
-        oversold_cross = data[(data['Prev_RSI'] > 30) & (data['RSI'] <= 30)]
+
+        # Compute RSI without touching the caller's frame
+        rsi_values = pd.Series(indicators.rsi(data['Close'], self.window), index = data.index, name = 'RSI')
+        data = rsi_values.to_frame()
+
+        overbought_cross = data[crosses_above(data['RSI'], 70)]
+        oversold_cross = data[crosses_below(data['RSI'], 30)]
 
         overbought_dates = overbought_cross.index.date.tolist()
         oversold_dates = oversold_cross.index.date.tolist()
@@ -60,21 +54,13 @@ class Technical_Indicators:
     
     def macd(self, data):
 
-        data['EMA_Short'] = data['Close'].ewm(span = 12, adjust = False).mean()
-        data['EMA_Long'] = data['Close'].ewm(span = 26,  adjust = False).mean()
-
-        data['MACD'] = data['EMA_Short'] - data['EMA_Long']
-
-        data['Signal'] = data['MACD'].ewm(span = 9, adjust = False).mean()
-
-        data ['Histogram'] = data['MACD'] - data['Signal']
+        macd_line, signal_line, histogram = indicators.macd(data['Close'])
+        data = pd.DataFrame({'MACD': macd_line, 'Signal': signal_line, 'Histogram': histogram}, index = data.index)
 
         # Detect crossovers
-        data['Prev_MACD'] = data['MACD'].shift(1)
-        data['Prev_Signal'] = data['Signal'].shift(1)
-
-        buy_cross = data[(data['Prev_MACD'] < data['Prev_Signal']) & (data['MACD'] > data['Signal'])]
-        sell_cross = data[(data['Prev_MACD'] > data['Prev_Signal']) & (data['MACD'] < data['Signal'])]
+        crosses = crossover_signals(data['MACD'], data['Signal'], strict = True)
+        buy_cross = data[crosses == 1]
+        sell_cross = data[crosses == -1]
 
         # Extract crossover dates
         buy_dates = buy_cross.index.date.tolist()
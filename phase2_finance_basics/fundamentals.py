@@ -0,0 +1,121 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import yfinance as yf
+
+# The `info` fields the Stock class reads
+SNAPSHOT_FIELDS = [
+    'currentPrice', 'regularMarketPrice', 'sharesOutstanding', 'dividendRate',
+    'trailingEps', 'forwardEps', 'priceToBook', 'returnOnEquity', 'debtToEquity',
+]
+
+
+def yfinance_provider(symbol):
+    """Fetch the snapshot fields from Yahoo Finance (one HTTP round trip)."""
+    info = yf.Ticker(symbol).info
+    # Missing fields stay missing so Stock's `.get(field, default)` still applies
+    return {field: info[field] for field in SNAPSHOT_FIELDS if field in info}
+
+
+class FundamentalsCache:
+    """Disk-backed fundamentals snapshots with a time-to-live.
+
+    Snapshots are stored in one JSON file with the time they were fetched.
+    A snapshot older than `ttl` seconds is fetched again through `provider`,
+    which takes a symbol and returns a dict of `info` fields. Pass a stub
+    provider to run without network access.
+    """
+
+    def __init__(self, path='fundamentals_cache.json', ttl=24 * 3600, provider=None, max_workers=8):
+        self.path = path
+        self.ttl = ttl
+        self.provider = provider or yfinance_provider
+        self.max_workers = max_workers
+        self.last_load = None
+        self._lock = threading.Lock()
+        self._snapshots = {}
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                self._snapshots = json.load(f)
+
+    def _is_fresh(self, symbol):
+        entry = self._snapshots.get(symbol)
+        return entry is not None and time.time() - entry['fetched_at'] < self.ttl
+
+    def _fetch(self, symbol):
+        info = self.provider(symbol)
+        with self._lock:
+            self._snapshots[symbol] = {'fetched_at': time.time(), 'info': info}
+        return info
+
+    def save(self):
+        tmp_path = self.path + '.tmp'
+        with self._lock:
+            with open(tmp_path, 'w') as f:
+                json.dump(self._snapshots, f)
+        os.replace(tmp_path, self.path)
+
+    def get(self, symbol):
+        """Snapshot for one symbol, fetched only if missing or expired."""
+        symbol = symbol.upper()
+        if self._is_fresh(symbol):
+            return self._snapshots[symbol]['info']
+        info = self._fetch(symbol)
+        self.save()
+        return info
+
+    def load_many(self, symbols):
+        """Snapshots for many symbols; stale ones are fetched concurrently.
+
+        Returns {symbol: info}. Symbols whose fetch failed keep their expired
+        snapshot if there is one and are otherwise left out. Timings for the
+        call are kept in `last_load`.
+        """
+        start = time.perf_counter()
+        symbols = list(dict.fromkeys(s.upper() for s in symbols))
+        stale = [s for s in symbols if not self._is_fresh(s)]
+
+        errors = {}
+        if stale:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = {s: pool.submit(self._fetch, s) for s in stale}
+            for symbol, future in futures.items():
+                try:
+                    future.result()
+                except Exception as e:
+                    errors[symbol] = str(e)
+                    print(f"Failed to fetch fundamentals for {symbol}: {e}")
+            self.save()
+
+        self.last_load = {
+            'symbols': len(symbols),
+            'fetched': len(stale) - len(errors),
+            'from_cache': len(symbols) - len(stale),
+            'errors': errors,
+            'seconds': time.perf_counter() - start,
+        }
+        return {s: self._snapshots[s]['info'] for s in symbols if s in self._snapshots}
+
+
+_default_cache = None
+
+
+def default_cache():
+    """Process-wide cache in the working directory, created on first use."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = FundamentalsCache()
+    return _default_cache
+
+
+if __name__ == '__main__':
+    symbols = input('Enter ticker symbols: ').upper().split()
+    cache = FundamentalsCache()
+    for label in ('First load', 'Second load'):
+        cache.load_many(symbols)
+        stats = cache.last_load
+        print(f"{label}: {stats['seconds']:.3f}s "
+              f"({stats['fetched']} fetched, {stats['from_cache']} from cache)")
@@ -0,0 +1,98 @@
+"""Indicators for many symbols and many parameters in one call.
+
+Each function takes an aligned (time x symbols) price matrix, as an ndarray or
+a DataFrame with one column per symbol, plus a list of windows/spans, and
+returns a (time x symbols x params) array. Each slice `out[:, j, k]` equals the
+single-series result from `indicators.py` for symbol `j` and parameter `k`.
+"""
+import numpy as np
+import pandas as pd
+
+
+def _as_matrix(prices):
+    values = np.asarray(prices, dtype = float)
+    if values.ndim == 1:
+        values = values[:, None]
+    if values.ndim != 2:
+        raise ValueError(f"Expected a (time x symbols) matrix, got shape {values.shape}")
+    return values
+
+
+def sma_grid(prices, windows):
+    """Rolling means for every window from one cumulative sum per symbol."""
+    values = _as_matrix(prices)
+    windows = np.asarray(windows, dtype = int)
+    n_time = values.shape[0]
+
+    # Centre each column first so the cumulative sums stay small and precise
+    is_nan = np.isnan(values)
+    center = np.zeros(values.shape[1])
+    has_data = ~is_nan.all(axis = 0)
+    center[has_data] = np.nanmean(values[:, has_data], axis = 0)
+    centred = np.where(is_nan, 0.0, values - center)
+
+    csum = np.vstack([np.zeros((1, values.shape[1])), np.cumsum(centred, axis = 0)])
+    nan_count = np.vstack([np.zeros((1, values.shape[1]), dtype = int), np.cumsum(is_nan, axis = 0)])
+
+    # One slice subtraction per window over every symbol at once
+    out = np.full((len(windows), n_time, values.shape[1]), np.nan)
+    for k, window in enumerate(windows):
+        if window > n_time:
+            continue
+        sums = csum[window:] - csum[:-window]
+        nans = nan_count[window:] - nan_count[:-window]
+        out[k, window - 1:] = np.where(nans > 0, np.nan, sums / window + center)
+    return out.transpose(1, 2, 0)
+
+
+def ema_grid(prices, spans):
+    """`ewm(span, adjust=False)` for every span over every symbol."""
+    values = _as_matrix(prices)
+    n_time, n_symbols = values.shape
+    if n_symbols * len(spans) < 64:
+        # Few lanes over a long history: pandas' compiled loop per span is faster
+        frame = pd.DataFrame(values)
+        return np.stack([frame.ewm(span = span, adjust = False).mean().to_numpy() for span in spans], axis = 2)
+
+    # Step through time once, updating every (symbol, span) lane together.
+    # This is the same recurrence pandas uses, including the weight decay on NaN bars.
+    alpha = np.broadcast_to(2.0 / (np.asarray(spans, dtype = float) + 1), (n_symbols, len(spans)))
+    decay = 1 - alpha
+    weighted = np.full((n_symbols, len(spans)), np.nan)
+    old_weight = np.ones((n_symbols, len(spans)))
+    out = np.empty((n_time, n_symbols, len(spans)))
+    for t in range(n_time):
+        x = np.broadcast_to(values[t][:, None], weighted.shape)
+        observed = ~np.isnan(x)
+        started = ~np.isnan(weighted)
+        old_weight = np.where(started, old_weight * decay, old_weight)
+        blended = (old_weight * weighted + alpha * x) / (old_weight + alpha)
+        weighted = np.where(started & observed & (weighted != x), blended,
+                            np.where(~started & observed, x, weighted))
+        old_weight = np.where(observed, 1.0, old_weight)
+        out[t] = weighted
+    return out
+
+
+def rsi_grid(prices, windows):
+    """RSI for every window; gains and losses are computed once for all windows."""
+    values = _as_matrix(prices)
+    change = np.vstack([np.full((1, values.shape[1]), np.nan), np.diff(values, axis = 0)])
+    gain = np.where(change > 0, change, 0.0)
+    loss = np.where(change < 0, -change, 0.0)
+
+    avg_gain = ema_grid(gain, windows)
+    avg_loss = ema_grid(loss, windows)
+    rs = avg_gain / np.where(avg_loss == 0, 1e-10, avg_loss)
+    return 100 - (100 / (1 + rs))
+
+
+def grid_to_frame(grid, index, symbols, params, name):
+    """Long-format frame with one row per (time, symbol, param)."""
+    n_time, n_symbols, n_params = grid.shape
+    return pd.DataFrame({
+        'Date': np.repeat(np.asarray(index), n_symbols * n_params),
+        'Symbol': np.tile(np.repeat(np.asarray(symbols), n_params), n_time),
+        'Param': np.tile(np.asarray(params), n_time * n_symbols),
+        name: grid.reshape(-1),
+    })
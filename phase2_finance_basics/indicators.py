@@ -0,0 +1,64 @@
+"""Headless indicator computations.
+
+Every function takes a close-price array (list, ndarray or Series), leaves it
+untouched and returns only the indicator values as NumPy arrays. Nothing here
+prints, plots or imports matplotlib, so it is safe to use in batch jobs. The
+formulas are the ones the plotting classes have always used.
+"""
+import numpy as np
+import pandas as pd
+
+
+def _as_close(close):
+    values = np.asarray(close, dtype=float)
+    if values.ndim == 2 and values.shape[1] == 1:
+        # yfinance single-ticker frames come back as one-column DataFrames
+        values = values[:, 0]
+    if values.ndim != 1:
+        raise ValueError(f"Expected a 1-D close-price array, got shape {values.shape}")
+    return values
+
+
+def sma(close, window):
+    """Simple moving average; NaN until `window` bars are available."""
+    return pd.Series(_as_close(close)).rolling(window = window).mean().to_numpy()
+
+
+def ema(close, span):
+    """Exponential moving average, `ewm(span, adjust=False)`."""
+    return pd.Series(_as_close(close)).ewm(span = span, adjust = False).mean().to_numpy()
+
+
+def rsi(close, window = 20):
+    """Relative Strength Index using EMA-smoothed gains and losses."""
+    close = _as_close(close)
+    change = np.empty_like(close)
+    change[0] = np.nan
+    np.subtract(close[1:], close[:-1], out = change[1:])
+
+    gain = np.where(change > 0, change, 0.0)
+    loss = np.where(change < 0, -change, 0.0)
+    avg_gain = ema(gain, window)
+    avg_loss = ema(loss, window)
+
+    rs = avg_gain / np.where(avg_loss == 0, 1e-10, avg_loss)
+    return 100 - (100 / (1 + rs))
+
+
+def macd(close, fast = 12, slow = 26, signal = 9):
+    """MACD line, signal line and histogram."""
+    close = _as_close(close)
+    macd_line = ema(close, fast) - ema(close, slow)
+    signal_line = ema(macd_line, signal)
+    return macd_line, signal_line, macd_line - signal_line
+
+
+def moving_averages(close, short_window = 20, long_window = 50):
+    """Short/long SMA and EMA keyed by the column names the plots use."""
+    close = _as_close(close)
+    return {
+        'SMA_short': sma(close, short_window),
+        'SMA_long': sma(close, long_window),
+        'EMA_short': ema(close, short_window),
+        'EMA_long': ema(close, long_window),
+    }
@@ -2,6 +2,8 @@ import yfinance as yf
 import matplotlib.pyplot as plt
 import pandas as pd
 
+from signals import crossover_signals
+
 class BuySell:
     def __init__(self, symbol, period = '2yr'):
         self.symbol = symbol
@@ -13,13 +15,8 @@ class BuySell:
         data['SMA_short'] = data['Close'].rolling(window = short_window).mean()
         data['SMA_long'] = data['Close'].rolling(window = long_window).mean()
 
-        data['Signal'] = 0
-
-        for i in range(short_window, len(data)):
-            if data['SMA_short'].iloc[i] > data['SMA_long'].iloc[i] and data['SMA_short'].iloc[i-1] <= data['SMA_long'].iloc[i-1]:
-                data.loc[data.index[i], 'Signal'] = 1  # Buy signal
-            elif data['SMA_short'].iloc[i] < data['SMA_long'].iloc[i] and data['SMA_short'].iloc[i-1] >= data['SMA_long'].iloc[i-1]:
-                data.loc[data.index[i], 'Signal'] = -1  # Sell signal
+        # 1 = Buy signal, -1 = Sell signal
+        data['Signal'] = crossover_signals(data['SMA_short'], data['SMA_long'], start = short_window)
 
         buy_dates = data[data['Signal'] == 1].index.date.tolist()
         sell_dates = data[data['Signal'] == -1].index.date.tolist()
@@ -1,11 +1,18 @@
+import os
+import sys
 from financial_statements import Technical_Indicators
-import yfinance as yf
 from stock_info import Stock
 from market_info import BuySell
 from technical_indicators import SMA_EMA
 
-def analyze_stock(symbol):
-    data = yf.download(symbol, period = '6mo', interval = '1d')
+# Batch downloader lives with the Phase 1 fetcher
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'phase1_data_engineering'))
+from fetch_data import fetch_many
+from fundamentals import FundamentalsCache
+
+fundamentals = FundamentalsCache()
+
+def analyze_stock(symbol, data):
     BuySell(symbol, data)
 
     print("\n============================")
@@ -14,7 +21,7 @@ def analyze_stock(symbol):
 
     # ---------- Fundamentals ----------
     print("\n🔹 Fundamental Indicators:")
-    stock = Stock(symbol)
+    stock = Stock(symbol, cache = fundamentals)
     print(stock.market_cap())
     print(stock.dividend_info())
     print(stock.eps_info())
@@ -39,5 +46,9 @@ def analyze_stock(symbol):
 
 if __name__ == '__main__':
     symbols = input('Enter the ticker symbol of the stock:').upper().split()
-    for symbol in symbols:
-        analyze_stock(symbol)
\ No newline at end of file
+    result = fetch_many(symbols, period = '6mo', interval = '1d')
+    fundamentals.load_many(result.frames)
+    for symbol, error in result.errors.items():
+        print(f"Skipping {symbol}: {error}")
+    for symbol, data in result.frames.items():
+        analyze_stock(symbol, data)
\ No newline at end of file
@@ -0,0 +1,55 @@
+import numpy as np
+
+
+def _as_array(values):
+    return np.asarray(values, dtype=float)
+
+
+def crossover_signals(fast, slow, start=1, strict=False):
+    """Crossover events between two aligned series in one array pass.
+
+    Returns an int8 array with 1 where `fast` crosses above `slow`, -1 where
+    it crosses below and 0 elsewhere. By default a cross is counted when the
+    previous bar was touching (<= / >=), as in the SMA crossover strategy;
+    `strict=True` requires the previous bar to be strictly on the other side,
+    as in the MACD/signal crossover. Bars before `start` never signal and
+    comparisons against NaN are False, like the original per-row loop.
+    """
+    fast = _as_array(fast)
+    slow = _as_array(slow)
+    signals = np.zeros(len(fast), dtype=np.int8)
+    start = max(start, 1)
+    if len(fast) <= start:
+        return signals
+
+    cur_fast, cur_slow = fast[start:], slow[start:]
+    prev_fast, prev_slow = fast[start - 1:-1], slow[start - 1:-1]
+
+    if strict:
+        was_below = prev_fast < prev_slow
+        was_above = prev_fast > prev_slow
+    else:
+        was_below = prev_fast <= prev_slow
+        was_above = prev_fast >= prev_slow
+
+    up = (cur_fast > cur_slow) & was_below
+    down = (cur_fast < cur_slow) & was_above
+    signals[start:][up] = 1
+    signals[start:][down] = -1
+    return signals
+
+
+def crosses_above(values, level):
+    """True where `values` reaches `level` from below (prev < level <= current)."""
+    values = _as_array(values)
+    out = np.zeros(len(values), dtype=bool)
+    out[1:] = (values[:-1] < level) & (values[1:] >= level)
+    return out
+
+
+def crosses_below(values, level):
+    """True where `values` reaches `level` from above (prev > level >= current)."""
+    values = _as_array(values)
+    out = np.zeros(len(values), dtype=bool)
+    out[1:] = (values[:-1] > level) & (values[1:] <= level)
+    return out
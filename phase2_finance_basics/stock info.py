@@ -1,10 +1,11 @@
-import yfinance as yf
+from fundamentals import default_cache
 
 class Stock:
-    def __init__(self, ticker_symbol):
+    def __init__(self, ticker_symbol, cache=None):
         self.ticker_symbol = ticker_symbol
-        ticker = yf.Ticker(ticker_symbol)
-        info = ticker.info
+        # Read from the fundamentals snapshot; the network is only hit when it has expired
+        cache = cache or default_cache()
+        info = cache.get(ticker_symbol)
 
         # --- Core Financial Data ---
         self.price = info.get('currentPrice') or info.get('regularMarketPrice')
@@ -0,0 +1,215 @@
+"""Incremental indicator state for bar-by-bar updates.
+
+Each state object is seeded once from history and then updated one bar at a
+time in constant time. Values match the pandas formulas in `indicators.py`
+(`ewm(span, adjust=False)` and `rolling(window)`), including how NaN bars are
+handled. States serialize to plain dicts so they can be saved between runs
+with `save_states` / `load_states`.
+"""
+import json
+import math
+import os
+from collections import deque
+
+import numpy as np
+
+from indicators import ema
+
+
+class EMAState:
+    """Exponential moving average, same recursion as `ewm(span, adjust=False)`."""
+
+    def __init__(self, span, value = math.nan, old_weight = 1.0):
+        self.span = span
+        self.alpha = 2.0 / (span + 1)
+        self.value = value
+        # Weight of `value` relative to the next observation; decays on NaN bars
+        self.old_weight = old_weight
+
+    @classmethod
+    def from_history(cls, values, span):
+        values = np.asarray(values, dtype = float)
+        valid = np.flatnonzero(~np.isnan(values))
+        if len(valid) == 0:
+            return cls(span)
+        state = cls(span, float(ema(values, span)[-1]))
+        trailing_nans = len(values) - 1 - valid[-1]
+        state.old_weight = (1 - state.alpha) ** trailing_nans
+        return state
+
+    def update(self, x):
+        if math.isnan(self.value):
+            if not math.isnan(x):
+                self.value = x
+                self.old_weight = 1.0
+            return self.value
+        self.old_weight *= 1 - self.alpha
+        if not math.isnan(x):
+            if self.value != x:
+                self.value = (self.old_weight * self.value + self.alpha * x) / (self.old_weight + self.alpha)
+            self.old_weight = 1.0
+        return self.value
+
+    def to_dict(self):
+        return {'type': 'ema', 'span': self.span, 'value': self.value, 'old_weight': self.old_weight}
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d['span'], d['value'], d['old_weight'])
+
+
+class SMAState:
+    """Rolling mean over the last `window` bars; NaN until the window is full."""
+
+    def __init__(self, window, buffer = ()):
+        self.window = window
+        self.buffer = deque(buffer, maxlen = window)
+        self._reset_sum()
+
+    def _reset_sum(self):
+        valid = [v for v in self.buffer if not math.isnan(v)]
+        self.total = math.fsum(valid)
+        self.compensation = 0.0
+        self.nan_count = len(self.buffer) - len(valid)
+
+    def _add(self, x):
+        # Kahan summation keeps the running total from drifting
+        y = x - self.compensation
+        t = self.total + y
+        self.compensation = (t - self.total) - y
+        self.total = t
+
+    @classmethod
+    def from_history(cls, values, window):
+        values = np.asarray(values, dtype = float)
+        return cls(window, values[-window:].tolist())
+
+    @property
+    def value(self):
+        if len(self.buffer) < self.window or self.nan_count:
+            return math.nan
+        return self.total / self.window
+
+    def update(self, x):
+        if len(self.buffer) == self.window:
+            old = self.buffer[0]
+            if math.isnan(old):
+                self.nan_count -= 1
+            else:
+                self._add(-old)
+        self.buffer.append(x)
+        if math.isnan(x):
+            self.nan_count += 1
+        else:
+            self._add(x)
+        return self.value
+
+    def to_dict(self):
+        return {'type': 'sma', 'window': self.window, 'buffer': list(self.buffer)}
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d['window'], d['buffer'])
+
+
+class RSIState:
+    """RSI from EMA-smoothed gains and losses, as in `indicators.rsi`."""
+
+    def __init__(self, window = 20, prev_close = None, avg_gain = None, avg_loss = None):
+        self.window = window
+        self.prev_close = prev_close
+        self.avg_gain = avg_gain or EMAState(window)
+        self.avg_loss = avg_loss or EMAState(window)
+
+    @classmethod
+    def from_history(cls, close, window = 20):
+        close = np.asarray(close, dtype = float)
+        if len(close) == 0:
+            return cls(window)
+        change = np.concatenate([[np.nan], np.diff(close)])
+        gain = np.where(change > 0, change, 0.0)
+        loss = np.where(change < 0, -change, 0.0)
+        return cls(window, float(close[-1]),
+                   EMAState.from_history(gain, window), EMAState.from_history(loss, window))
+
+    @property
+    def value(self):
+        avg_loss = self.avg_loss.value
+        rs = self.avg_gain.value / (1e-10 if avg_loss == 0 else avg_loss)
+        return 100 - (100 / (1 + rs))
+
+    def update(self, close):
+        change = math.nan if self.prev_close is None else close - self.prev_close
+        self.prev_close = close
+        self.avg_gain.update(change if change > 0 else 0.0)
+        self.avg_loss.update(-change if change < 0 else 0.0)
+        return self.value
+
+    def to_dict(self):
+        return {'type': 'rsi', 'window': self.window, 'prev_close': self.prev_close,
+                'avg_gain': self.avg_gain.to_dict(), 'avg_loss': self.avg_loss.to_dict()}
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d['window'], d['prev_close'],
+                   EMAState.from_dict(d['avg_gain']), EMAState.from_dict(d['avg_loss']))
+
+
+class MACDState:
+    """MACD line, signal line and histogram, as in `indicators.macd`."""
+
+    def __init__(self, fast = 12, slow = 26, signal = 9, fast_ema = None, slow_ema = None, signal_ema = None):
+        self.fast_ema = fast_ema or EMAState(fast)
+        self.slow_ema = slow_ema or EMAState(slow)
+        self.signal_ema = signal_ema or EMAState(signal)
+
+    @classmethod
+    def from_history(cls, close, fast = 12, slow = 26, signal = 9):
+        close = np.asarray(close, dtype = float)
+        macd_line = ema(close, fast) - ema(close, slow)
+        return cls(fast, slow, signal,
+                   EMAState.from_history(close, fast), EMAState.from_history(close, slow),
+                   EMAState.from_history(macd_line, signal))
+
+    @property
+    def value(self):
+        macd_line = self.fast_ema.value - self.slow_ema.value
+        signal_line = self.signal_ema.value
+        return macd_line, signal_line, macd_line - signal_line
+
+    def update(self, close):
+        macd_line = self.fast_ema.update(close) - self.slow_ema.update(close)
+        signal_line = self.signal_ema.update(macd_line)
+        return macd_line, signal_line, macd_line - signal_line
+
+    def to_dict(self):
+        return {'type': 'macd', 'fast_ema': self.fast_ema.to_dict(),
+                'slow_ema': self.slow_ema.to_dict(), 'signal_ema': self.signal_ema.to_dict()}
+
+    @classmethod
+    def from_dict(cls, d):
+        fast_ema = EMAState.from_dict(d['fast_ema'])
+        slow_ema = EMAState.from_dict(d['slow_ema'])
+        signal_ema = EMAState.from_dict(d['signal_ema'])
+        return cls(fast_ema.span, slow_ema.span, signal_ema.span, fast_ema, slow_ema, signal_ema)
+
+
+STATE_TYPES = {'ema': EMAState, 'sma': SMAState, 'rsi': RSIState, 'macd': MACDState}
+
+
+def state_from_dict(d):
+    return STATE_TYPES[d['type']].from_dict(d)
+
+
+def save_states(states, path):
+    """Write a {name: state} mapping to JSON, replacing the file atomically."""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({name: state.to_dict() for name, state in states.items()}, f)
+    os.replace(tmp_path, path)
+
+
+def load_states(path):
+    """Read a mapping written by `save_states`."""
+    with open(path, 'r') as f:
+        return {name: state_from_dict(d) for name, d in json.load(f).items()}
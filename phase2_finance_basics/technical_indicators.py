@@ -2,14 +2,15 @@ import pandas as pd
 import yfinance as yf
 import matplotlib.pyplot as plt
 
+import indicators
+
 class SMA_EMA:
     def moving_averages(self,symbol, data, period = '6mo', short_window = 20, long_window = 50):
         
-        # Calculate moving averages
-        data['SMA_short'] = data['Close'].rolling(window = short_window).mean()
-        data['SMA_long'] = data ['Close'].rolling(window = long_window).mean()
-        data['EMA_short'] = data['Close'].ewm(span = short_window, adjust = False).mean()
-        data['EMA_long'] = data ['Close'].ewm(span = long_window, adjust = False).mean()
+        # Calculate moving averages without touching the caller's frame
+        averages = pd.DataFrame(indicators.moving_averages(data['Close'], short_window, long_window), index = data.index)
+        averages['Close'] = data['Close']
+        data = averages
 
         # Plotting
         plt.figure(figsize=(12, 6))
@@ -23,3 +24,5 @@ class SMA_EMA:
         plt.ylabel("Price")
         plt.legend()
         plt.show()
+
+        return averages.drop(columns = 'Close')
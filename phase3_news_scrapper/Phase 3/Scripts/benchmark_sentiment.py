@@ -0,0 +1,70 @@
+"""Throughput benchmark for batch sentiment scoring.
+
+Usage: python benchmark_sentiment.py [n_headlines] [workers]
+
+Scores `n_headlines` (default 100,000) synthetic headlines with the
+process-pool `score_titles`. It also runs the original per-row `iterrows`
+loop on a 2,000-headline sample, reports headlines/sec for both, and checks
+that the scores match exactly.
+"""
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+from textblob import TextBlob
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+from sentiment_anlaysis import clean_text, lexicon_adjust, score_titles
+
+SUBJECTS = ["Microsoft", "Apple", "Tesla", "Nvidia", "Reliance", "The Dow", "Tech stocks", "Oil prices"]
+VERBS = ["surge", "plunge", "rally", "drop", "beat estimates", "miss forecasts", "hold steady", "slip"]
+TAILS = ["after strong earnings", "as investors weigh rate cuts", "on weak guidance",
+         "amid record high volumes", "after analyst downgrade", "in choppy trading", "ahead of Fed decision"]
+
+def synthetic_headlines(n, seed=0):
+    rng = random.Random(seed)
+    return [f"{rng.choice(SUBJECTS)} {rng.choice(VERBS)} {rng.choice(TAILS)} ({i})" for i in range(n)]
+
+def legacy_scores(titles):
+    # The per-row loop from sentiment_analysis.py before batching
+    analyzer = SentimentIntensityAnalyzer()
+    df = pd.DataFrame({"title": titles})
+    scores, labels, subjectivities = [], [], []
+    for _, row in df.iterrows():
+        title = clean_text(row.get("title", ""))
+        lower = title.lower()
+        vader = analyzer.polarity_scores(title)["compound"]
+        tb = TextBlob(title).sentiment
+        combined = 0.65 * vader + 0.35 * tb.polarity + lexicon_adjust(lower)
+        combined = max(-1.0, min(1.0, combined))
+        if combined > 0.05:
+            label = "Positive"
+        elif combined < -0.05:
+            label = "Negative"
+        else:
+            label = "Neutral"
+        scores.append(combined)
+        labels.append(label)
+        subjectivities.append(tb.subjectivity)
+    return pd.DataFrame({"sentiment": scores, "sentiment_label": labels, "subjectivity": subjectivities})
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+    titles = [clean_text(t) for t in synthetic_headlines(n)]
+
+    sample = titles[:2000]
+    t0 = time.perf_counter()
+    expected = legacy_scores(sample)
+    legacy_time = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    result = score_titles(titles, workers=workers)
+    batch_time = time.perf_counter() - t0
+
+    matches = expected.equals(result.iloc[:len(sample)].reset_index(drop=True))
+    print(f"Legacy loop: {len(sample) / legacy_time:,.0f} headlines/sec (sample of {len(sample):,})")
+    print(f"Batch:       {n / batch_time:,.0f} headlines/sec ({n:,} headlines, {workers} workers, {batch_time:.1f}s)")
+    print(f"Scores identical on the sample: {matches}")
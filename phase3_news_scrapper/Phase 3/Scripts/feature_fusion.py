@@ -1,62 +1,285 @@
 import pandas as pd
-import os, datetime, json, boto3
+import os, io, glob, datetime, json
+
+from feature_matrix import FeatureMatrix, write_latest_row
+from storage import close_uploaders, open_uploader
 
 # Paths
 script_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(script_dir)
 mini_projects = os.path.dirname(project_root)
 
-# Load config
-config_path = os.path.join(project_root, 'config.json')
-with open(config_path, 'r') as f:
-    config = json.load(f)
-
 # Directories
 data_processed_dir = os.path.join(project_root, "Data", "Processed")
 data_fused_dir = os.path.join(project_root, "Data", "Fused")
-os.makedirs(data_fused_dir, exist_ok=True)
+data_matrix_dir = os.path.join(data_fused_dir, "matrix")  # binary copies for Phase 4
+data_latest_dir = os.path.join(data_fused_dir, "latest")  # last row per symbol, for daily prediction
 data_analysed_dir = os.path.join(mini_projects, 'Phase 2', 'data', 'phase2_datasets')
 
 # File names
-date_str = datetime.datetime.now().strftime("%Y-%m-%d")
-indicators_path = os.path.join(data_analysed_dir, "MSFT_analysis_data.csv")  # Phase 2 output
+config_path = os.path.join(project_root, 'config.json')
+INDICATOR_SUFFIX = "_analysis_data.csv"  # Phase 2 output, one file per symbol
 sentiment_path = os.path.join(data_processed_dir, "master_sentiment.csv")  # Phase 3 output
-fused_path = os.path.join(data_fused_dir, "fused_features.csv")  # single master file
+# Bumped by sentiment_analysis.py each time it rewrites master_sentiment.csv
+sentiment_generation_path = os.path.join(data_processed_dir, "master_sentiment_generation.json")
+state_path = os.path.join(data_fused_dir, "fusion_state.json")
+SENTIMENT_COLUMNS = ["mean_sentiment", "sentiment_count"]
+
+def fused_path_for(symbol):
+    return os.path.join(data_fused_dir, f"{symbol}_fused_features.csv")
+
+def latest_path_for(symbol):
+    return os.path.join(data_latest_dir, f"{symbol}.json")
+
+# ---- state ----
+def load_state(path):
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            return json.load(f)
+    return {}
+
+def save_state(path, state):
+    with open(path + ".tmp", 'w') as f:
+        json.dump(state, f)
+    os.replace(path + ".tmp", path)
+
+# ---- sentiment ----
+MARKET = ""  # bucket for headlines without a symbol (RSS feeds); they count for every symbol
+
+def read_generation(path):
+    if not os.path.exists(path):
+        return 0
+    with open(path, 'r') as f:
+        return json.load(f)["generation"]
+
+def update_sentiment_days(path, sent_state, generation_path=sentiment_generation_path):
+    """Fold rows appended to master_sentiment.csv since the last run into per-(symbol, date) sums.
+
+    `sent_state` keeps the byte offset read so far and
+    {symbol: {date: [sum, count]}}, with untagged headlines under MARKET.
+    Only the bytes after the offset are parsed. If the file was rewritten
+    rather than appended to (its rewrite generation or inode changed, or it
+    shrank) it is aggregated again from the start, as is a state from
+    before the split by symbol. Returns {symbol: dates whose aggregate
+    changed}.
+    """
+    if not os.path.exists(path):
+        return {}
+    stat = os.stat(path)
+    size = stat.st_size
+    generation = read_generation(generation_path)
+    changed = {}
+    rewritten = "offset" in sent_state and (
+        size < sent_state["offset"]
+        or sent_state.get("generation") != generation
+        or sent_state.get("inode") != stat.st_ino
+    )
+    if rewritten or "days" in sent_state:
+        old = sent_state.get("symbols", {MARKET: sent_state.get("days", {})})
+        for symbol, days in old.items():
+            changed.setdefault(symbol, set()).update(days)
+        sent_state.clear()
+    offset = sent_state.get("offset", 0)
+    if size == offset:
+        return changed
+
+    with open(path, "rb") as f:
+        f.seek(offset)
+        chunk = io.BytesIO(f.read(size - offset))
+    if offset:
+        new = pd.read_csv(chunk, names=sent_state["columns"], header=None)
+    else:
+        new = pd.read_csv(chunk)
+        sent_state["columns"] = new.columns.tolist()
+        sent_state["symbols"] = {}
+    sent_state.update(offset=size, generation=generation, inode=stat.st_ino)
+
+    new["published"] = pd.to_datetime(new["published"], errors='coerce').dt.strftime("%Y-%m-%d")
+    new["sentiment"] = pd.to_numeric(new["sentiment"], errors='coerce')
+    if "symbol" in new.columns:
+        new["symbol"] = new["symbol"].fillna(MARKET).astype(str).str.strip().str.upper()
+    else:
+        new["symbol"] = MARKET
+    new = new.dropna(subset=["published", "sentiment"])
+    agg = new.groupby(["symbol", "published"])["sentiment"].agg(["sum", "count"])
+    buckets = sent_state["symbols"]
+    for (symbol, day), total, count in zip(agg.index, agg["sum"], agg["count"]):
+        days = buckets.setdefault(symbol, {})
+        prev_total, prev_count = days.get(day, [0.0, 0])
+        days[day] = [prev_total + float(total), prev_count + int(count)]
+        changed.setdefault(symbol, set()).add(day)
+    return changed
+
+def sentiment_for(sent_state, symbol):
+    """{date: [sum, count]} for `symbol`: its own headlines plus the untagged ones."""
+    buckets = sent_state.get("symbols", {})
+    days = {day: list(sums) for day, sums in buckets.get(MARKET, {}).items()}
+    if symbol != MARKET:
+        for day, (total, count) in buckets.get(symbol, {}).items():
+            prev_total, prev_count = days.get(day, [0.0, 0])
+            days[day] = [prev_total + total, prev_count + count]
+    return days
+
+def add_sentiment(frame, days):
+    """Set the sentiment columns of `frame` from the per-date sums (neutral 0 when no news)."""
+    sums = [days.get(d, [0.0, 0]) for d in frame["Date"]]
+    frame["mean_sentiment"] = [total / count if count else 0.0 for total, count in sums]
+    frame["sentiment_count"] = [float(count) for _, count in sums]
+    return frame
+
+# ---- indicators ----
+def read_indicators(path):
+    """Phase 2 indicators with ISO date strings; rows without a valid Date are dropped."""
+    df = pd.read_csv(path)
+    df["Date"] = pd.to_datetime(df["Date"], errors='coerce').dt.strftime("%Y-%m-%d")
+    # e.g. the ticker row yfinance leaves under a MultiIndex header
+    df = df.dropna(subset=["Date"]).drop_duplicates(subset="Date", keep="last")
+    return df.drop(columns=[c for c in SENTIMENT_COLUMNS if c in df.columns]).reset_index(drop=True)
+
+def row_hashes(df):
+    hashes = pd.util.hash_pandas_object(df, index=False)
+    return {day: int(h) for day, h in zip(df["Date"], hashes)}
+
+# ---- fused output ----
+def write_rows(path, frame, offset=None):
+    """Write `frame` at byte `offset` of `path` (a new file with header when None).
+
+    Anything after `offset` is truncated. Returns (offset of the last row, end offset).
+    """
+    head = frame.iloc[:-1].to_csv(index=False, header=offset is None, lineterminator="\n")
+    last = frame.iloc[-1:].to_csv(index=False, header=False, lineterminator="\n")
+    with open(path, "wb" if offset is None else "r+b") as f:
+        if offset is not None:
+            f.seek(offset)
+        f.write(head.encode("utf-8"))
+        tail_offset = f.tell()
+        f.write(last.encode("utf-8"))
+        f.truncate()
+        return tail_offset, f.tell()
+
+def read_tail_row(path, sym_state):
+    with open(path, "rb") as f:
+        f.seek(sym_state["tail_offset"])
+        return pd.read_csv(f, names=sym_state["columns"], header=None)
+
+def upsert_symbol(symbol, indicators_path, sym_state, days, sentiment_dates):
+    """Bring {symbol}_fused_features.csv up to date; returns its path if it changed.
+
+    Indicator rows are compared by hash with the previous run. Only dates
+    whose indicators or news changed are fused again. New dates after the
+    last fused one are appended, and a change to the last row rewrites just
+    that row. Only changes further back rewrite the file. The binary
+    FeatureMatrix under Data/Fused/matrix/{symbol} gets the same rows, and
+    Data/Fused/latest/{symbol}.json holds the last one.
+    """
+    fused_path = fused_path_for(symbol)
+    matrix = FeatureMatrix(os.path.join(data_matrix_dir, symbol))
+    if not (os.path.exists(fused_path) and matrix.exists()):
+        sym_state.clear()
+    stat = os.stat(indicators_path)
+
+    indicators = None
+    changed, removed = set(), set()
+    if (sym_state.get("mtime"), sym_state.get("size")) != (stat.st_mtime, stat.st_size):
+        indicators = read_indicators(indicators_path)
+        hashes = row_hashes(indicators)
+        old_hashes = sym_state.get("rows", {})
+        changed = {d for d, h in hashes.items() if old_hashes.get(d) != h}
+        removed = set(old_hashes) - set(hashes)
+        sym_state.update(mtime=stat.st_mtime, size=stat.st_size, rows=hashes)
+    news_only = {d for d in sentiment_dates if d in sym_state.get("rows", {})} - changed
+    if not (changed or removed or news_only):
+        return None
+
+    def fused(dates):
+        rows = indicators[indicators["Date"].isin(dates)] if dates else pd.DataFrame()
+        return add_sentiment(rows.copy(), days) if not rows.empty else rows
 
-# Load data
-indicators_df = pd.read_csv(indicators_path)
-sentiment_df = pd.read_csv(sentiment_path)
+    last_date = sym_state.get("last_date")
+    if indicators is not None and indicators.columns.tolist() + SENTIMENT_COLUMNS != sym_state.get("columns"):
+        # New or different indicator columns: rebuild the file
+        changed, last_date = set(sym_state["rows"]), None
+    touched = changed | removed | news_only
+    if last_date is None:
+        # First run for this symbol: write everything
+        parts, offset = [fused(changed)], None
+    elif not removed and min(touched) >= last_date:
+        # Fast path: new dates, plus possibly the last row again
+        parts = []
+        if last_date in touched:
+            offset, start_row = sym_state["tail_offset"], matrix.n_rows - 1
+            if last_date in news_only:
+                parts.append(add_sentiment(read_tail_row(fused_path, sym_state), days))
+        else:
+            offset, start_row = sym_state["end"], matrix.n_rows
+        parts.append(fused(changed))
+    else:
+        # Historical change: rewrite the file
+        old = pd.read_csv(fused_path)
+        old = old[~old["Date"].isin(changed | removed)]
+        old = add_sentiment(old, days) if news_only else old
+        parts, offset = [old, fused(changed)], None
 
-# Convert date columns
-indicators_df["Date"] = pd.to_datetime(indicators_df["Date"], errors='coerce').dt.date
-sentiment_df["published"] = pd.to_datetime(sentiment_df["published"], errors='coerce').dt.date
+    parts = [p for p in parts if not p.empty]
+    if not parts:
+        sym_state.clear()
+        if os.path.exists(fused_path):
+            os.remove(fused_path)
+        if matrix.exists():
+            os.remove(matrix.schema_path)
+        if os.path.exists(latest_path_for(symbol)):
+            os.remove(latest_path_for(symbol))
+        return None
+    frame = pd.concat(parts, ignore_index=True).sort_values("Date", kind="stable").reset_index(drop=True)
+    tail_offset, end = write_rows(fused_path, frame, offset)
+    matrix.write(frame, None if offset is None else start_row)
+    write_latest_row(latest_path_for(symbol), symbol, frame)
+    if offset is None:
+        sym_state["columns"] = frame.columns.tolist()
+    sym_state.update(last_date=frame["Date"].iloc[-1], tail_offset=tail_offset, end=end)
+    print(f"{symbol}: fused {len(changed)} changed, {len(news_only)} re-scored, "
+          f"{len(removed)} removed dates -> {fused_path}")
+    return fused_path
 
-# Aggregate sentiment by date
-sentiment_agg = sentiment_df.groupby("published").agg(
-    mean_sentiment=("sentiment", "mean"),
-    sentiment_count=("sentiment", "count")
-).reset_index().rename(columns={"published": "Date"})
+# ---- main ----
+def main():
+    with open(config_path, 'r') as f:
+        config = json.load(f)
+    os.makedirs(data_fused_dir, exist_ok=True)
 
-# Merge
-merged_df = pd.merge(indicators_df, sentiment_agg, on="Date", how="left")
+    state = load_state(state_path)
+    sentiment = state.setdefault("sentiment", {})
+    news_changed = update_sentiment_days(sentiment_path, sentiment)
 
-# Fill missing sentiment with neutral (0)
-merged_df["mean_sentiment"].fillna(0, inplace=True)
-merged_df["sentiment_count"].fillna(0, inplace=True)
-merged_df['Close'] = indicators_df['Close']
+    indicator_files = sorted(glob.glob(os.path.join(data_analysed_dir, "*" + INDICATOR_SUFFIX)))
+    if not indicator_files:
+        raise FileNotFoundError(f"No *{INDICATOR_SUFFIX} files in {data_analysed_dir}")
 
-# Append if previous file exists
-if os.path.exists(fused_path):
-    old_df = pd.read_csv(fused_path)
-    old_df["Date"] = pd.to_datetime(old_df["Date"], errors='coerce').dt.date
-    merged_df = pd.concat([old_df, merged_df], ignore_index=True)
-    merged_df.drop_duplicates(subset="Date", keep="last", inplace=True)
+    symbols = state.setdefault("symbols", {})
+    updated = []
+    for path in indicator_files:
+        symbol = os.path.basename(path)[:-len(INDICATOR_SUFFIX)].upper()
+        # Untagged headlines move every symbol's sentiment, tagged ones only their own
+        sentiment_dates = news_changed.get(symbol, set()) | news_changed.get(MARKET, set())
+        days = sentiment_for(sentiment, symbol)
+        if upsert_symbol(symbol, path, symbols.setdefault(symbol, {}), days, sentiment_dates):
+            updated.append(symbol)
+    save_state(state_path, state)
 
-# Save updated file
-merged_df.to_csv(fused_path, index=False)
+    # Queue changed files for upload; they are sent in the background
+    uploader = open_uploader(config, project_root) if updated else None
+    if uploader:
+        for symbol in updated:
+            uploader.submit(fused_path_for(symbol), f"Fused/{symbol}_fused_features.csv")
+            matrix_dir = os.path.join(data_matrix_dir, symbol)
+            for name in sorted(os.listdir(matrix_dir)):
+                uploader.submit(os.path.join(matrix_dir, name), f"Fused/matrix/{symbol}/{name}")
+            uploader.submit(latest_path_for(symbol), f"Fused/latest/{symbol}.json")
 
-# Upload to S3
-s3 = boto3.client("s3")
-s3.upload_file(fused_path, "phase-3-bucket", "Fused/fused_features.csv")
+    date_str = datetime.datetime.now().strftime("%Y-%m-%d")
+    print(f"[{date_str}] Feature fusion complete: {len(updated)} of {len(indicator_files)} symbols updated"
+          f" in {data_fused_dir}")
 
-print(f"Feature fusion complete. File saved and uploaded at: {fused_path}")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
+    close_uploaders()
@@ -0,0 +1,108 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+TARGET = "Close"
+# Columns that are never model inputs (same list train_model.py drops)
+NON_FEATURES = ["Date", "symbol", "Name", "Company", "Ticker", "Unnamed: 0", TARGET]
+
+# Raw little-endian files next to schema.json; rows are in fused-file order
+FILES = {
+    "features": ("features.bin", "<f4"),  # (n_rows, n_features), row-major
+    "target": ("target.bin", "<f8"),
+    "dates": ("dates.bin", "<M8[D]"),
+}
+
+def feature_columns(frame):
+    return [c for c in frame.columns if c not in NON_FEATURES]
+
+class FeatureMatrix:
+    """Binary copy of one symbol's fused features, readable with np.memmap.
+
+    Features are float32 (what the sklearn trees compute on anyway), the
+    Close target is float64 and dates are datetime64[D]. Each is a raw
+    row-major file, so new rows are appended and the last row is rewritten
+    in place without touching the rest. schema.json lists the feature
+    order, dtypes and `n_rows`; readers trust `n_rows`, not the file sizes.
+    Values that are not numeric (e.g. the Symbol column) are stored as NaN.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.schema_path = os.path.join(path, "schema.json")
+        self.schema = None
+        if os.path.exists(self.schema_path):
+            with open(self.schema_path, "r") as f:
+                self.schema = json.load(f)
+
+    def exists(self):
+        return self.schema is not None
+
+    @property
+    def n_rows(self):
+        return self.schema["n_rows"] if self.schema else 0
+
+    def _arrays(self, frame, features):
+        numeric = frame[features].apply(pd.to_numeric, errors="coerce")
+        return {
+            "features": numeric.to_numpy(dtype=np.float32),
+            "target": pd.to_numeric(frame[TARGET], errors="coerce").to_numpy(dtype=np.float64),
+            "dates": pd.to_datetime(frame["Date"]).to_numpy().astype("datetime64[D]"),
+        }
+
+    def write(self, frame, start_row=None):
+        """Write `frame`'s rows from `start_row` on and drop any rows after them.
+
+        With `start_row=None` the matrix is rebuilt with the columns of `frame`.
+        """
+        if start_row is None or self.schema is None:
+            start_row = 0
+            features = feature_columns(frame)
+        else:
+            features = self.schema["features"]
+            if feature_columns(frame) != features:
+                raise ValueError(f"Columns of {self.path} changed; rebuild it with start_row=None")
+
+        os.makedirs(self.path, exist_ok=True)
+        for name, array in self._arrays(frame, features).items():
+            file_name, dtype = FILES[name]
+            array = np.ascontiguousarray(array, dtype=dtype)
+            row_bytes = array.itemsize * (len(features) if name == "features" else 1)
+            with open(os.path.join(self.path, file_name), "r+b" if start_row else "wb") as f:
+                f.seek(start_row * row_bytes)
+                f.write(array.tobytes())
+                f.truncate()
+
+        self.schema = {
+            "features": features,
+            "target": TARGET,
+            "dtypes": {name: dtype for name, (_, dtype) in FILES.items()},
+            "files": {name: file_name for name, (file_name, _) in FILES.items()},
+            "n_rows": start_row + len(frame),
+        }
+        with open(self.schema_path + ".tmp", "w") as f:
+            json.dump(self.schema, f, indent=2)
+        os.replace(self.schema_path + ".tmp", self.schema_path)
+
+def write_latest_row(path, symbol, frame):
+    """Write the last row of `frame` as a small JSON record: symbol, date, Close and features.
+
+    One file per symbol, so a reader that only needs today's features opens
+    one small file instead of scanning the history. Non-numeric values are null.
+    """
+    last = frame.iloc[-1:]
+    features = feature_columns(frame)
+    values = last[features].apply(pd.to_numeric, errors="coerce").astype("float64").iloc[0]
+    close = pd.to_numeric(last[TARGET], errors="coerce").iloc[0] if TARGET in frame.columns else None
+    record = {
+        "symbol": symbol,
+        "date": pd.to_datetime(last["Date"].iloc[0]).strftime("%Y-%m-%d"),
+        "close": None if pd.isna(close) else float(close),
+        "features": {name: None if pd.isna(v) else float(v) for name, v in values.items()},
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "w") as f:
+        json.dump(record, f)
+    os.replace(path + ".tmp", path)
@@ -0,0 +1,73 @@
+import json
+import re
+
+# Words are runs of letters/digits; hyphenated and apostrophe forms stay one
+# token, so "sell-off" is a single term and "fall" never matches "fallout".
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:[-'][a-z0-9]+)*")
+
+def tokenize(text_lower):
+    return TOKEN_RE.findall(text_lower)
+
+def head_word(token):
+    """Last part of a compound, without a possessive: "market-beating" -> "beating"."""
+    if token.endswith("'s"):
+        token = token[:-2]
+    return token.rsplit("-", 1)[-1]
+
+class LexiconMatcher:
+    """Whole-word matcher for a weighted phrase lexicon.
+
+    Terms are stored as token tuples in one dict. A headline is scanned once,
+    left to right. At each token the longest term starting there is taken
+    and the scan jumps past it, so a phrase hit is not counted again for its
+    words. The cost per headline depends on the headline length and the
+    longest term, not on the number of terms.
+
+    Inflected forms are separate entries in the lexicon, so "fall" matches
+    "falls" only if the lexicon lists it. A hyphenated or possessive word
+    that is not a term itself is looked up by its head word instead
+    ("market-beating" as "beating", "rally's" as "rally").
+    """
+
+    def __init__(self, weights):
+        self.terms = {}
+        for term, weight in weights.items():
+            tokens = tuple(tokenize(term.lower()))
+            if tokens:
+                self.terms[tokens] = float(weight)
+        # Longest term starting with each word; most words start no multi-word term
+        self.reach = {}
+        for tokens in self.terms:
+            self.reach[tokens[0]] = max(self.reach.get(tokens[0], 0), len(tokens))
+
+    @classmethod
+    def from_file(cls, path):
+        """Load a JSON lexicon mapping each term to its weight."""
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def __len__(self):
+        return len(self.terms)
+
+    def matches(self, text_lower):
+        """(term, weight) for every hit in `text_lower`, in order."""
+        tokens = tokenize(text_lower)
+        found = []
+        i = 0
+        while i < len(tokens):
+            for n in range(min(self.reach.get(tokens[i], 0), len(tokens) - i), 0, -1):
+                key = tuple(tokens[i:i + n])
+                if key in self.terms:
+                    found.append((" ".join(key), self.terms[key]))
+                    i += n
+                    break
+            else:
+                head = (head_word(tokens[i]),)
+                if head[0] != tokens[i] and head in self.terms:
+                    found.append((head[0], self.terms[head]))
+                i += 1
+        return found
+
+    def score(self, text_lower):
+        """Sum of the weights of all hits."""
+        return sum(weight for _, weight in self.matches(text_lower))
@@ -0,0 +1,135 @@
+import hashlib
+import os
+import sqlite3
+import sys
+
+import pandas as pd
+
+COLUMNS = ["title", "link", "published", "symbol", "source", "scraped_on"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS news (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    link TEXT,
+    published TEXT,
+    symbol TEXT,
+    source TEXT,
+    scraped_on TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_news_published ON news (published);
+CREATE INDEX IF NOT EXISTS idx_news_symbol_published ON news (symbol, published);
+"""
+
+def record_id(link, title):
+    """Dedup key: content hash of (link, title)."""
+    key = f"{link or ''}\x1f{title or ''}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+def _to_text(value):
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return None
+    return str(value)
+
+class NewsStore:
+    """Append-only news table in SQLite with a unique content-hash index.
+
+    New records are inserted with INSERT OR IGNORE against the hash index, so
+    adding a batch costs only the batch size and never rewrites history.
+    Queries by date range and symbol go through indexes. SQLite's file
+    locking (WAL mode plus a busy timeout) lets several processes append at
+    the same time. Use one NewsStore per thread.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM news").fetchone()[0]
+
+    def add(self, df):
+        """Insert the records of `df` not already stored; returns how many were new."""
+        df = df.dropna(subset=["title"])
+        if df.empty:
+            return 0
+        published = pd.to_datetime(df["published"], errors="coerce").dt.strftime("%Y-%m-%d")
+
+        def column(name):
+            values = df[name] if name in df.columns else pd.Series(None, index=df.index)
+            return [_to_text(v) for v in values]
+
+        titles, links = column("title"), column("link")
+        rows = [
+            (record_id(link, title), title, link, day, symbol, source, scraped_on)
+            for title, link, day, symbol, source, scraped_on in zip(
+                titles, links, [_to_text(v) for v in published],
+                column("symbol"), column("source"), column("scraped_on"))
+        ]
+
+        with self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO news (id, title, link, published, symbol, source, scraped_on) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            return self.conn.total_changes - before
+
+    def query(self, start=None, end=None, symbol=None):
+        """Records with `start <= published <= end` (ISO dates), optionally for one symbol."""
+        clauses, params = [], []
+        if start is not None:
+            clauses.append("published >= ?")
+            params.append(str(start))
+        if end is not None:
+            clauses.append("published <= ?")
+            params.append(str(end))
+        if symbol is not None:
+            clauses.append("symbol = ?")
+            params.append(symbol)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = f"SELECT {', '.join(COLUMNS)} FROM news{where} ORDER BY published DESC, seq"
+        return pd.read_sql_query(sql, self.conn, params=params)
+
+    def since(self, seq):
+        """Records inserted after sequence number `seq`, with their `seq` column.
+
+        Consumers keep the highest `seq` they have processed as a watermark
+        and read only newer records on the next run.
+        """
+        sql = f"SELECT seq, {', '.join(COLUMNS)} FROM news WHERE seq > ? ORDER BY seq"
+        return pd.read_sql_query(sql, self.conn, params=[seq])
+
+    def migrate_csv(self, csv_path):
+        """One-time import of an existing scraped_news.csv; returns rows added."""
+        df = pd.read_csv(csv_path, dtype=str)
+        for column in COLUMNS:
+            if column not in df.columns:
+                df[column] = None
+        added = self.add(df)
+        print(f"Migrated {added} of {len(df)} rows from {csv_path}")
+        return added
+
+def open_news_store(data_raw_dir, csv_name="scraped_news.csv"):
+    """Open Data/Raw/news.db, importing the legacy CSV the first time."""
+    store = NewsStore(os.path.join(data_raw_dir, "news.db"))
+    csv_path = os.path.join(data_raw_dir, csv_name)
+    if store.count() == 0 and os.path.exists(csv_path):
+        store.migrate_csv(csv_path)
+    return store
+
+if __name__ == "__main__":
+    # Usage: python news_store.py [path/to/scraped_news.csv]
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    data_raw_dir = os.path.join(os.path.dirname(script_dir), "Data", "Raw")
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(data_raw_dir, "scraped_news.csv")
+    store = NewsStore(os.path.join(data_raw_dir, "news.db"))
+    store.migrate_csv(csv_path)
+    print(f"Store now holds {store.count()} records.")
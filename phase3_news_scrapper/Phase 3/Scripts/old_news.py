@@ -1,26 +1,64 @@
 import requests
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, date
+import json
+import threading
 import time
-import random
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from news_store import open_news_store
 
 # =======================
 # CONFIG
 # =======================
-FINNHUB_API_KEY = "d3tqhlpr01qvr0dk3amgd3tqhlpr01qvr0dk3an0"  # replace with your own
-SYMBOL = "MSFT"                     # e.g., AAPL, TSLA, AMZN
+FINNHUB_API_KEY = os.getenv("FINNHUB_API_KEY", "d3tqhlpr01qvr0dk3amgd3tqhlpr01qvr0dk3an0")  # replace with your own
+FINNHUB_BASE_URL = os.getenv("FINNHUB_BASE_URL", "https://finnhub.io/api/v1")  # point at a stub for offline runs
+SYMBOLS = ["MSFT"]                  # e.g., AAPL, TSLA, AMZN
 DAYS_BACK = 7
+WINDOW_DAYS = 1                     # days covered by one company-news request
+CALLS_PER_MINUTE = 30               # free tier rate-limit
+MAX_WORKERS = 8
 OUTPUT_DIR = "Data/Raw"
 MASTER_FILE = "scraped_news.csv"
 LOG_FILE = "update_log.txt"
+CHECKPOINT_FILE = "backfill_checkpoint.jsonl"
+PARTIAL_FILE = "backfill_partial.csv"
+
+# =======================
+# RATE LIMITING
+# =======================
+class TokenBucket:
+    """Thread-safe token bucket shared by every request of a backfill."""
+
+    def __init__(self, rate_per_sec, capacity=1):
+        self.rate = rate_per_sec
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
 
 # =======================
 # HELPER FUNCTIONS
 # =======================
-def get_finnhub_news(symbol, start_date, end_date):
-    """Fetch news for a given symbol and date range from Finnhub"""
-    url = "https://finnhub.io/api/v1/company-news"
+def get_finnhub_news(symbol, start_date, end_date, bucket=None, base_url=None, retries=3):
+    """Fetch news for a given symbol and date range from Finnhub.
+
+    Raises on failure so the caller can leave the chunk unfinished.
+    """
+    url = f"{base_url or FINNHUB_BASE_URL}/company-news"
     params = {
         "symbol": symbol,
         "from": start_date,
@@ -28,55 +66,116 @@ def get_finnhub_news(symbol, start_date, end_date):
         "token": FINNHUB_API_KEY
     }
 
-    try:
+    for attempt in range(retries):
+        if bucket is not None:
+            bucket.acquire()
         response = requests.get(url, params=params, timeout=10)
+        if response.status_code == 429 and attempt < retries - 1:
+            # Over quota despite the bucket (e.g. another process); back off
+            time.sleep(2 ** attempt)
+            continue
         response.raise_for_status()
         return response.json()
-    except Exception as e:
-        print(f"✗ Error fetching {start_date} → {end_date}: {e}")
-        return []
+
+def date_windows(start, end, window_days):
+    """Split [start, end] into windows aligned to fixed boundaries.
+
+    Alignment keeps window keys stable between runs, so checkpoints from an
+    earlier run still match.
+    """
+    first = start - timedelta(days=start.toordinal() % window_days)
+    windows = []
+    day = first
+    while day <= end:
+        windows.append((day, day + timedelta(days=window_days - 1)))
+        day += timedelta(days=window_days)
+    return windows
+
+def load_checkpoint(path):
+    done = set()
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            for line in f:
+                if line.strip():
+                    chunk = json.loads(line)
+                    done.add((chunk["symbol"], chunk["from"], chunk["to"]))
+    return done
 
 # =======================
 # MAIN SCRAPER
 # =======================
-def scrape_finnhub_history(symbol, days_back):
+def backfill_finnhub(symbols, days_back, window_days=WINDOW_DAYS, calls_per_minute=CALLS_PER_MINUTE,
+                     max_workers=MAX_WORKERS, base_url=None, output_dir=OUTPUT_DIR):
+    """Fetch (symbol, window) chunks concurrently under one shared rate limit.
+
+    Each finished chunk's rows are appended to the partial file and then the
+    chunk is recorded in the checkpoint, so a restarted run skips it. Windows
+    that reach today are never checkpointed since more news can still arrive.
+    Returns the rows collected in the partial file, including those from an
+    interrupted earlier run.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    checkpoint_path = os.path.join(output_dir, CHECKPOINT_FILE)
+    partial_path = os.path.join(output_dir, PARTIAL_FILE)
+
+    today = datetime.now().date()
+    done = load_checkpoint(checkpoint_path)
+    chunks = [
+        (symbol, start.isoformat(), end.isoformat())
+        for symbol in symbols
+        for start, end in date_windows(today - timedelta(days=days_back - 1), today, window_days)
+    ]
+    todo = [c for c in chunks if c not in done]
+    print(f"\n{len(chunks)} chunks for {len(symbols)} symbols, {len(chunks) - len(todo)} already done\n")
+
+    bucket = TokenBucket(calls_per_minute / 60.0)
+    write_lock = threading.Lock()
+    failed = []
+
+    def run_chunk(chunk):
+        symbol, from_date, to_date = chunk
+        news = get_finnhub_news(symbol, from_date, to_date, bucket=bucket, base_url=base_url)
+        rows = pd.DataFrame([{
+            "title": item.get("headline"),
+            "link": item.get("url"),
+            "published": item.get("datetime", 0),
+            "symbol": symbol
+        } for item in news], columns=["title", "link", "published", "symbol"])
+
+        with write_lock:
+            if not rows.empty:
+                rows.to_csv(partial_path, mode="a", index=False, header=not os.path.exists(partial_path))
+            if date.fromisoformat(to_date) < today:
+                with open(checkpoint_path, "a") as f:
+                    f.write(json.dumps({"symbol": symbol, "from": from_date, "to": to_date}) + "\n")
+        return len(rows)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(run_chunk, c): c for c in todo}
+        for future in as_completed(futures):
+            symbol, from_date, to_date = futures[future]
+            try:
+                print(f"→ {symbol} {from_date} → {to_date}: {future.result()} items")
+            except Exception as e:
+                failed.append(futures[future])
+                print(f"✗ Error fetching {symbol} {from_date} → {to_date}: {e}")
+
+    if failed:
+        print(f"\n✗ {len(failed)} chunks failed; rerun to retry them.")
+
+    if not os.path.exists(partial_path):
+        return pd.DataFrame(columns=["title", "link", "published", "symbol"])
+    return pd.read_csv(partial_path)
+
+def scrape_finnhub_history(symbols, days_back):
     os.makedirs(OUTPUT_DIR, exist_ok=True)
-    master_path = os.path.join(OUTPUT_DIR, MASTER_FILE)
     log_path = os.path.join(OUTPUT_DIR, LOG_FILE)
+    partial_path = os.path.join(OUTPUT_DIR, PARTIAL_FILE)
 
-    # Load existing data if available
-    if os.path.exists(master_path):
-        df_master = pd.read_csv(master_path)
-        print(f"Loaded existing master dataset with {len(df_master)} rows.")
-    else:
-        df_master = pd.DataFrame(columns=["title", "link", "published", "symbol"])
-        print("No existing master dataset found. Creating a new one.")
-
-    print(f"\nFetching last {days_back} days of news for {symbol}...\n")
-    all_news = []
-    today = datetime.now()
-
-    for i in range(days_back):
-        day = today - timedelta(days=i)
-        from_date = day.strftime("%Y-%m-%d")
-        to_date = (day + timedelta(days=1)).strftime("%Y-%m-%d")
-
-        print(f"→ Fetching {from_date}")
-        news = get_finnhub_news(symbol, from_date, to_date)
-
-        for item in news:
-            all_news.append({
-                "title": item.get("headline"),
-                "link": item.get("url"),
-                "published": item.get("datetime", 0),
-                "symbol": symbol
-            })
-
-        # polite delay for free tier rate-limit (30 calls/min)
-        time.sleep(random.uniform(1.5, 2.5))
+    print(f"\nFetching last {days_back} days of news for {', '.join(symbols)}...\n")
+    df_new = backfill_finnhub(symbols, days_back)
 
     # Process new data
-    df_new = pd.DataFrame(all_news)
     if df_new.empty:
         print("✗ No news found!")
         return
@@ -84,29 +183,25 @@ def scrape_finnhub_history(symbol, days_back):
     df_new["published"] = pd.to_datetime(df_new["published"], unit="s", errors="coerce").dt.date
     df_new.dropna(subset=["title"], inplace=True)
 
-    # Combine and deduplicate
-    df_combined = pd.concat([df_master, df_new], ignore_index=True)
-    df_combined.drop_duplicates(subset=["title", "link", "published"], inplace=True)
-
-    # ✅ Normalize all date formats before sorting
-    df_combined["published"] = pd.to_datetime(df_combined["published"], errors="coerce").dt.date
-
-    df_combined.sort_values("published", ascending=False, inplace=True)
-    df_combined.reset_index(drop=True, inplace=True)
+    # Append only unseen records; the store dedupes on (link, title)
+    store = open_news_store(OUTPUT_DIR, MASTER_FILE)
+    added = store.add(df_new)
+    total = store.count()
+    store.close()
 
-    # Save updated master file
-    df_combined.to_csv(master_path, index=False)
+    # Stored rows are safe now; finished chunks stay checkpointed
+    os.remove(partial_path)
 
     # Log update
     with open(log_path, "a") as log:
-        log.write(f"Updated {symbol} | {datetime.now().isoformat()} | Total: {len(df_combined)}\n")
+        log.write(f"Updated {', '.join(symbols)} | {datetime.now().isoformat()} | Total: {total}\n")
 
-    print(f"\n✓ Master dataset updated — {len(df_combined)} total entries")
-    print(f"   Date range: {df_combined['published'].min()} → {df_combined['published'].max()}")
-    print(f"   Saved at: {master_path}")
+    print(f"\n✓ News store updated — {added} new, {total} total entries")
+    print(f"   Date range: {df_new['published'].min()} → {df_new['published'].max()}")
+    print(f"   Saved at: {store.path}")
 
 # =======================
 # RUN
 # =======================
 if __name__ == "__main__":
-    scrape_finnhub_history(SYMBOL, DAYS_BACK)
+    scrape_finnhub_history(SYMBOLS, DAYS_BACK)
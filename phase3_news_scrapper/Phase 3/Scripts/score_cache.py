@@ -0,0 +1,93 @@
+import hashlib
+import sqlite3
+
+import pandas as pd
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    key TEXT PRIMARY KEY,
+    sentiment REAL,
+    sentiment_label TEXT,
+    subjectivity REAL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value INTEGER
+);
+"""
+
+SCORE_COLUMNS = ["sentiment", "sentiment_label", "subjectivity"]
+
+def title_key(clean_title):
+    """Cache key: hash of the cleaned headline."""
+    return hashlib.sha1(clean_title.encode("utf-8")).hexdigest()
+
+class ScoreCache:
+    """Sentiment scores keyed by headline hash, plus the news-store watermark.
+
+    A headline is scored once. Later runs look its key up here instead of
+    running the analyzers again. The digest of the scorer that produced the
+    scores (lexicon and formula) is kept next to them; a caller that finds
+    a different digest must clear the cache rather than reuse the scores.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+
+    def known(self, keys):
+        """The subset of `keys` that already has a score."""
+        found = set()
+        keys = list(keys)
+        # Stay below SQLite's bound-parameter limit
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            placeholders = ", ".join("?" * len(chunk))
+            rows = self.conn.execute(f"SELECT key FROM scores WHERE key IN ({placeholders})", chunk)
+            found.update(row[0] for row in rows)
+        return found
+
+    def add(self, keys, scores):
+        """Store scores for `keys`; `scores` is a frame with SCORE_COLUMNS."""
+        rows = zip(keys, scores["sentiment"].astype(float), scores["sentiment_label"],
+                   scores["subjectivity"].astype(float))
+        with self.conn:
+            self.conn.executemany("INSERT OR IGNORE INTO scores VALUES (?, ?, ?, ?)", rows)
+
+    def get_watermark(self):
+        row = self.conn.execute("SELECT value FROM meta WHERE name = 'news_seq'").fetchone()
+        return row[0] if row else 0
+
+    def set_watermark(self, seq):
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('news_seq', ?)", (int(seq),))
+
+    def get_scorer(self):
+        """Digest of the scorer the cached scores came from, or None if unknown."""
+        row = self.conn.execute("SELECT value FROM meta WHERE name = 'scorer'").fetchone()
+        return row[0] if row else None
+
+    def set_scorer(self, digest):
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('scorer', ?)", (digest,))
+
+    def clear(self):
+        """Drop every cached score; the watermark is kept."""
+        with self.conn:
+            self.conn.execute("DELETE FROM scores")
+
+    def seed_from_master(self, master_df, clean_text):
+        """Fill an empty cache from an existing master_sentiment.csv frame."""
+        master_df = master_df.dropna(subset=["title"])
+        keys = [title_key(clean_text(t)) for t in master_df["title"]]
+        scores = master_df[SCORE_COLUMNS].copy()
+        scores["sentiment"] = pd.to_numeric(scores["sentiment"], errors="coerce")
+        scores["subjectivity"] = pd.to_numeric(scores["subjectivity"], errors="coerce")
+        self.add(keys, scores)
@@ -5,72 +5,161 @@ import datetime
 import json
 import boto3
 import requests
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from news_store import open_news_store
 
 # Get absolute paths
 script_dir = os.path.dirname(os.path.abspath(__file__))
 config_path = os.path.join(os.path.dirname(script_dir), 'config.json')
-
-# Load config
-with open(config_path, 'r') as f:
-    config = json.load(f)
-
-rss_urls = config["rss_feeds"]
 project_root = os.path.dirname(script_dir)
 data_raw_dir = os.path.join(project_root, "Data", "Raw")
-os.makedirs(data_raw_dir, exist_ok=True)
-
-base_fname = config.get("output_filename", "scraped_news.csv")
-master_path = os.path.join(data_raw_dir, base_fname)
-
-# Scrape headlines
-all_entries = []
-for url in rss_urls:
-    print(f"Fetching feed: {url}")
-    try:
-        headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"}
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        feed = feedparser.parse(response.text)
-        print(f"Fetched {len(feed.entries)} entries from {url}")
-    except Exception as e:
-        print(f"Failed to fetch {url}: {e}")
-        continue
-    time.sleep(5)
-    for entry in feed.entries:
-        all_entries.append({
-            "title": entry.title,
-            "link": entry.link,
-            "published": getattr(entry, "published", "N/A"),
-            "source": url
-        })
-
-# Create DataFrame
-df_new = pd.DataFrame(all_entries)
-df_new['published'] = pd.to_datetime(df_new['published'], errors='coerce', utc=True)
-df_new['published'] = df_new['published'].dt.date
-df_new["published"].fillna(datetime.date.today(), inplace=True)
-df_new["scraped_on"] = datetime.date.today()
-
-# Load existing master file (if exists)
-if os.path.exists(master_path):
-    df_master = pd.read_csv(master_path)
-    print(f"Loaded existing master dataset with {len(df_master)} rows.")
-else:
-    df_master = pd.DataFrame(columns=df_new.columns)
-    print("No existing master dataset found. Creating a new one.")
-
-# Combine and drop duplicates
-df_combined = pd.concat([df_master, df_new], ignore_index=True)
-df_combined.drop_duplicates(subset=["title", "link", "published"], inplace=True)
-df_combined.reset_index(drop=True, inplace=True)
-
-# Save updated master file
-df_combined.to_csv(master_path, index=False)
-
-# Log update time
-log_path = os.path.join(data_raw_dir, "update_log.txt")
-with open(log_path, "a") as log:
-    log.write(f"Updated on {datetime.datetime.now().isoformat()} | Rows: {len(df_combined)}\n")
-
-print(f"Appended and uploaded master dataset with {len(df_combined)} total entries.")
+
+HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"}
+
+# ---- politeness ----
+class HostThrottle:
+    """Keeps at least `delay` seconds between requests to the same host.
+
+    Requests to different hosts are not held back by each other, which
+    replaces the old fixed sleep after every feed.
+    """
+
+    def __init__(self, delay):
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._host_locks = {}
+        self._next_allowed = {}
+
+    def wait(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            host_lock = self._host_locks.setdefault(host, threading.Lock())
+        with host_lock:
+            pause = self._next_allowed.get(host, 0) - time.monotonic()
+            if pause > 0:
+                time.sleep(pause)
+            self._next_allowed[host] = time.monotonic() + self.delay
+
+# ---- fetching ----
+def fetch_feed(url, validators=None, throttle=None, timeout=10):
+    """Fetch one feed with a conditional GET.
+
+    `validators` holds the ETag / Last-Modified seen on the previous run.
+    Returns (entries, validators); entries is empty when the server answers
+    304 Not Modified, in which case nothing is downloaded or parsed.
+    """
+    validators = validators or {}
+    headers = dict(HEADERS)
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+
+    if throttle is not None:
+        throttle.wait(url)
+    response = requests.get(url, headers=headers, timeout=timeout)
+    if response.status_code == 304:
+        print(f"Not modified: {url}")
+        return [], validators
+    response.raise_for_status()
+
+    feed = feedparser.parse(response.content)
+    print(f"Fetched {len(feed.entries)} entries from {url}")
+    entries = [{
+        "title": entry.title,
+        "link": entry.link,
+        "published": getattr(entry, "published", "N/A"),
+        "source": url
+    } for entry in feed.entries]
+
+    new_validators = {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+    }
+    return entries, new_validators
+
+def fetch_feeds(urls, feed_state, max_workers=16, per_host_delay=2.0):
+    """Fetch all feeds concurrently; returns (entries, updated feed_state)."""
+    throttle = HostThrottle(per_host_delay)
+    new_state = dict(feed_state)
+    all_entries = []
+
+    def fetch(url):
+        return fetch_feed(url, feed_state.get(url), throttle)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {url: pool.submit(fetch, url) for url in urls}
+    for url, future in futures.items():
+        try:
+            entries, validators = future.result()
+        except Exception as e:
+            print(f"Failed to fetch {url}: {e}")
+            continue
+        new_state[url] = validators
+        all_entries.extend(entries)
+    return all_entries, new_state
+
+def load_feed_state(path):
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            return json.load(f)
+    return {}
+
+def save_feed_state(path, feed_state):
+    with open(path + ".tmp", 'w') as f:
+        json.dump(feed_state, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+# ---- main ----
+def main():
+    # Load config
+    with open(config_path, 'r') as f:
+        config = json.load(f)
+
+    rss_urls = config["rss_feeds"]
+    os.makedirs(data_raw_dir, exist_ok=True)
+
+    base_fname = config.get("output_filename", "scraped_news.csv")
+    feed_state_path = os.path.join(data_raw_dir, "feed_state.json")
+
+    # Scrape headlines
+    all_entries, feed_state = fetch_feeds(
+        rss_urls,
+        load_feed_state(feed_state_path),
+        max_workers=config.get("fetch_workers", 16),
+        per_host_delay=config.get("per_host_delay", 2.0),
+    )
+
+    if not all_entries:
+        save_feed_state(feed_state_path, feed_state)
+        print("No new entries; master dataset unchanged.")
+        return
+
+    # Create DataFrame
+    df_new = pd.DataFrame(all_entries)
+    df_new['published'] = pd.to_datetime(df_new['published'], errors='coerce', utc=True)
+    df_new['published'] = df_new['published'].dt.date
+    df_new["published"].fillna(datetime.date.today(), inplace=True)
+    df_new["scraped_on"] = datetime.date.today()
+
+    # Append only unseen records; the store dedupes on (link, title)
+    store = open_news_store(data_raw_dir, base_fname)
+    added = store.add(df_new)
+    total = store.count()
+    store.close()
+    # Only now that the entries are stored may the next run skip them with a 304
+    save_feed_state(feed_state_path, feed_state)
+
+    # Log update time
+    log_path = os.path.join(data_raw_dir, "update_log.txt")
+    with open(log_path, "a") as log:
+        log.write(f"Updated on {datetime.datetime.now().isoformat()} | Rows: {total}\n")
+
+    print(f"Appended {added} new entries; news store holds {total} total entries.")
+
+if __name__ == "__main__":
+    main()
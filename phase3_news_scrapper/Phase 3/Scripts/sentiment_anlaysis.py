@@ -2,25 +2,32 @@
 import os
 import json
 import datetime
+import numpy as np
 import pandas as pd
 from textblob import TextBlob
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 import re
-import boto3
+import sys
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+
+from news_store import open_news_store
+from score_cache import ScoreCache, SCORE_COLUMNS, title_key
+from lexicon import LexiconMatcher
+from storage import close_uploaders, open_uploader
 
 # ---- config / paths ----
 script_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(script_dir)
 data_raw_dir = os.path.join(project_root, "Data", "Raw")
 data_processed_dir = os.path.join(project_root, "Data", "Processed")
-os.makedirs(data_processed_dir, exist_ok=True)
-
-date_str = datetime.datetime.now().strftime("%Y-%m-%d")
-raw_path = os.path.join(data_raw_dir, f"scraped_news.csv")
-if not os.path.exists(raw_path):
-    raise FileNotFoundError(f"Raw file not found: {raw_path}")
 
 master_path = os.path.join(data_processed_dir, "master_sentiment.csv")
+# Bumped whenever master_sentiment.csv is rewritten instead of appended to, so
+# readers that tail it by byte offset (feature_fusion.py) know to start over
+master_generation_path = os.path.join(data_processed_dir, "master_sentiment_generation.json")
+cache_path = os.path.join(data_processed_dir, "sentiment_cache.db")
+config_path = os.path.join(project_root, "config.json")
 
 # ---- text cleaning ----
 def clean_text(s):
@@ -32,106 +39,190 @@ def clean_text(s):
     return s
 
 # ---- finance lexicon ----
-FIN_POS = [
-    "rally", "rallies", "gain", "gains", "surge", "soar", "beat", "beats",
-    "upgraded", "upgrade", "record high", "record-high", "strong earnings",
-    "outperform", "bullish", "bounce", "turnaround", "recovery"
-]
-FIN_NEG = [
-    "plunge", "plunges", "drop", "drops", "decline", "declines", "miss",
-    "misses", "downgrade", "downgrades", "weak", "weakness", "warns",
-    "selloff", "sell-off", "cut forecast", "loss", "fall", "fallen"
-]
+# Term weights live in finance_lexicon.json; point FIN_LEXICON_PATH at another file to swap it
+lexicon_path = os.getenv("FIN_LEXICON_PATH", os.path.join(project_root, "finance_lexicon.json"))
+FIN_LEXICON = LexiconMatcher.from_file(lexicon_path)
 
 def lexicon_adjust(text_lower):
-    adjust = 0.0
-    for phrase in ["strong earnings", "record high", "cut forecast", "turnaround"]:
-        if phrase in text_lower:
-            if phrase in FIN_POS:
-                adjust += 0.18
-            elif phrase in FIN_NEG:
-                adjust -= 0.18
-    for w in FIN_POS:
-        if w in text_lower:
-            adjust += 0.08
-    for w in FIN_NEG:
-        if w in text_lower:
-            adjust -= 0.10
-    return adjust
-
-# ---- analyzer ----
-analyzer = SentimentIntensityAnalyzer()
-
-# ---- read raw data ----
-df = pd.read_csv(raw_path, dtype=str)
-df.fillna("", inplace=True)
-if "title" not in df.columns:
-    raise ValueError("Expected 'title' column in raw CSV")
-
-if "published" in df.columns:
-    try:
-        df["published"] = pd.to_datetime(df["published"], errors="coerce").dt.date
-    except Exception:
-        df["published"] = datetime.date.today()
-else:
-    df["published"] = datetime.date.today()
+    return FIN_LEXICON.score(text_lower)
 
-# ---- sentiment scoring ----
-scores, labels, subjectivities = [], [], []
+# Bump when the scoring formula or the matcher changes, so cached scores are redone
+SCORER_VERSION = 2
 
-for _, row in df.iterrows():
-    title = clean_text(row.get("title", ""))
-    lower = title.lower()
+def scorer_digest():
+    """Hash of the scoring formula version and the lexicon terms and weights."""
+    terms = sorted((" ".join(tokens), weight) for tokens, weight in FIN_LEXICON.terms.items())
+    payload = json.dumps({"version": SCORER_VERSION, "lexicon": terms})
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
 
-    vader = analyzer.polarity_scores(title)["compound"]
-    tb = TextBlob(title).sentiment
-    combined = 0.65 * vader + 0.35 * tb.polarity + lexicon_adjust(lower)
-    combined = max(-1.0, min(1.0, combined))
+# ---- sentiment scoring ----
+_analyzer = None
+
+def _init_worker():
+    # Build the analyzer once per process instead of once per chunk
+    global _analyzer
+    _analyzer = SentimentIntensityAnalyzer()
+
+def _score_chunk(titles):
+    """Raw component scores for a chunk of cleaned titles."""
+    if _analyzer is None:
+        _init_worker()
+    n = len(titles)
+    vader = np.empty(n)
+    polarity = np.empty(n)
+    subjectivity = np.empty(n)
+    adjust = np.empty(n)
+    for i, title in enumerate(titles):
+        vader[i] = _analyzer.polarity_scores(title)["compound"]
+        tb = TextBlob(title).sentiment
+        polarity[i] = tb.polarity
+        subjectivity[i] = tb.subjectivity
+        adjust[i] = lexicon_adjust(title.lower())
+    return vader, polarity, subjectivity, adjust
+
+def score_titles(titles, workers=None, chunk_size=2000):
+    """Score cleaned titles; returns a frame with SCORE_COLUMNS.
+
+    Titles are split into chunks of `chunk_size` and scored on a pool of
+    `workers` processes (default: one per CPU). A single chunk is scored in
+    this process to skip the pool start-up cost. The components are combined
+    column-wise with the same formula as before, so the scores are identical.
+    """
+    titles = list(titles)
+    chunks = [titles[i:i + chunk_size] for i in range(0, len(titles), chunk_size)]
+    if workers == 1 or len(chunks) <= 1:
+        parts = [_score_chunk(chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            parts = list(pool.map(_score_chunk, chunks))
 
-    if combined > 0.05:
-        label = "Positive"
-    elif combined < -0.05:
-        label = "Negative"
+    if parts:
+        vader, polarity, subjectivity, adjust = (np.concatenate(p) for p in zip(*parts))
+    else:
+        vader = polarity = subjectivity = adjust = np.empty(0)
+
+    combined = np.clip(0.65 * vader + 0.35 * polarity + adjust, -1.0, 1.0)
+    labels = np.where(combined > 0.05, "Positive", np.where(combined < -0.05, "Negative", "Neutral"))
+    return pd.DataFrame({"sentiment": combined, "sentiment_label": labels, "subjectivity": subjectivity})
+
+def rescore_master(config):
+    """Score every title in master_sentiment.csv again and rewrite it; returns the frame."""
+    master = pd.read_csv(master_path, dtype=str)
+    has_title = master["title"].notna()
+    scores = score_titles(master.loc[has_title, "title"].map(clean_text), workers=config.get("score_workers"),
+                          chunk_size=config.get("score_chunk_size", 2000))
+    for column in SCORE_COLUMNS:
+        master.loc[has_title, column] = scores[column].astype(str).to_numpy()
+    master.to_csv(master_path + ".tmp", index=False)
+    os.replace(master_path + ".tmp", master_path)
+    bump_master_generation()
+    return master
+
+def read_master_generation(path=master_generation_path):
+    if not os.path.exists(path):
+        return 0
+    with open(path, "r") as f:
+        return json.load(f)["generation"]
+
+def bump_master_generation():
+    """Record a rewrite of master_sentiment.csv; returns the new generation."""
+    generation = read_master_generation() + 1
+    with open(master_generation_path + ".tmp", "w") as f:
+        json.dump({"generation": generation,
+                   "rewritten_at": datetime.datetime.now().isoformat(timespec="seconds")}, f)
+    os.replace(master_generation_path + ".tmp", master_generation_path)
+    return generation
+
+def append_to_master(df):
+    """Append scored rows to master_sentiment.csv without rewriting it."""
+    if os.path.exists(master_path):
+        columns = pd.read_csv(master_path, nrows=0).columns
+        df.reindex(columns=columns).to_csv(master_path, mode="a", header=False, index=False)
     else:
-        label = "Neutral"
-
-    scores.append(combined)
-    labels.append(label)
-    subjectivities.append(tb.subjectivity)
-
-df["sentiment"] = scores
-df["sentiment_label"] = labels
-df["subjectivity"] = subjectivities
-df.drop_duplicates(subset=["title"], keep="first", inplace=True)
-
-# ---- append to master ----
-if os.path.exists(master_path):
-    df_master = pd.read_csv(master_path, dtype=str)
-    df_master["published"] = pd.to_datetime(df_master["published"], errors="coerce").dt.date
-    df_master["sentiment"] = pd.to_numeric(df_master["sentiment"], errors="coerce")
-else:
-    df_master = pd.DataFrame()
-
-df_combined = pd.concat([df_master, df], ignore_index=True)
-df_combined.drop_duplicates(subset=["title"], keep="first", inplace=True)
-df_combined.sort_values("published", ascending=False, inplace=True)
-df_combined.to_csv(master_path, index=False)
-
-# ---- summary ----
-summary = {
-    "date": date_str,
-    "num_articles": int(len(df)),
-    "avg_sentiment": float(df["sentiment"].mean()),
-    "num_positive": int((df["sentiment_label"] == "Positive").sum()),
-    "num_neutral": int((df["sentiment_label"] == "Neutral").sum()),
-    "num_negative": int((df["sentiment_label"] == "Negative").sum()),
-}
-
-# ---- upload to S3 ----
-s3 = boto3.client("s3")
-bucket = "phase-3-bucket"
-s3.upload_file(master_path, bucket, "Processed/master_sentiment.csv")
-
-print(f"✓ Updated master file: {master_path}")
-print(f"✓ Uploaded to S3 bucket: {bucket}")
-print("Summary:", json.dumps(summary, indent=2))
\ No newline at end of file
+        df.to_csv(master_path, index=False)
+
+# ---- incremental run ----
+def main(full=False):
+    """Score only headlines that are new since the last run.
+
+    Rows added to the news store after the saved watermark are cleaned and
+    hashed. Titles whose hash is already in the score cache are skipped, and
+    the rest are scored and appended to master_sentiment.csv. With
+    `full=True` the whole store is re-read; cached titles are still skipped.
+    When the lexicon or the formula changed since the cache was filled,
+    master_sentiment.csv is rescored first and the cache rebuilt from it.
+    """
+    os.makedirs(data_processed_dir, exist_ok=True)
+    with open(config_path, "r") as f:
+        config = json.load(f)
+    date_str = datetime.datetime.now().strftime("%Y-%m-%d")
+
+    news_store = open_news_store(data_raw_dir)
+    if news_store.count() == 0:
+        raise FileNotFoundError(f"No news found in store: {news_store.path}")
+
+    cache = ScoreCache(cache_path)
+    scorer = scorer_digest()
+    if cache.get_scorer() != scorer:
+        # The lexicon or formula changed (or the cache predates the digest):
+        # cached and master scores came from another scorer, so redo them all
+        cache.clear()
+        if os.path.exists(master_path):
+            master = rescore_master(config)
+            cache.seed_from_master(master, clean_text)
+            print(f"Scorer changed: rescored {cache.count()} titles in {master_path}")
+        cache.set_scorer(scorer)
+
+    # ---- read new raw data ----
+    df = news_store.since(0 if full else cache.get_watermark())
+    if df.empty:
+        print("No new headlines since the last run.")
+        return
+    last_seq = int(df["seq"].max())
+    df = df.drop(columns=["seq"])
+    df.fillna("", inplace=True)
+    df["published"] = pd.to_datetime(df["published"], errors="coerce").dt.date
+
+    df["clean_title"] = df["title"].map(clean_text)
+    df["key"] = df["clean_title"].map(title_key)
+    df.drop_duplicates(subset=["key"], keep="first", inplace=True)
+    df = df[~df["key"].isin(cache.known(df["key"]))]
+    if df.empty:
+        cache.set_watermark(last_seq)
+        print("All new headlines were already scored.")
+        return
+
+    # ---- sentiment scoring (new titles only) ----
+    scores = score_titles(df["clean_title"], workers=config.get("score_workers"),
+                          chunk_size=config.get("score_chunk_size", 2000))
+    for column in SCORE_COLUMNS:
+        df[column] = scores[column].to_numpy()
+    keys = df["key"].tolist()
+    df = df.drop(columns=["clean_title", "key"])
+
+    # ---- append to master ----
+    append_to_master(df)
+    cache.add(keys, df[SCORE_COLUMNS])
+    cache.set_watermark(last_seq)
+
+    # ---- summary ----
+    summary = {
+        "date": date_str,
+        "num_articles": int(len(df)),
+        "avg_sentiment": float(df["sentiment"].mean()),
+        "num_positive": int((df["sentiment_label"] == "Positive").sum()),
+        "num_neutral": int((df["sentiment_label"] == "Neutral").sum()),
+        "num_negative": int((df["sentiment_label"] == "Negative").sum()),
+    }
+
+    # ---- upload (in the background) ----
+    uploader = open_uploader(config, project_root)
+    if uploader:
+        uploader.submit(master_path, "Processed/master_sentiment.csv")
+
+    print(f"✓ Updated master file: {master_path}")
+    print("Summary:", json.dumps(summary, indent=2))
+
+if __name__ == "__main__":
+    main(full="--full" in sys.argv)
+    close_uploaders()
@@ -0,0 +1,178 @@
+import atexit
+import hashlib
+import json
+import os
+import queue
+import shutil
+import threading
+
+MB = 1024 * 1024
+
+# ---- backends ----
+class LocalStorage:
+    """Copies artifacts into a directory; a drop-in for S3 when working offline."""
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+
+    def url(self, key):
+        return f"file://{os.path.join(self.root, key)}"
+
+    def upload(self, local_path, key):
+        target = os.path.join(self.root, key)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.copyfile(local_path, target + ".tmp")
+        os.replace(target + ".tmp", target)
+
+class S3Storage:
+    """Uploads artifacts to an S3 bucket.
+
+    Files above `multipart_threshold` are sent as a multipart upload in
+    `chunk_size` parts, `max_concurrency` parts at a time.
+    """
+
+    def __init__(self, bucket, prefix="", multipart_threshold=8 * MB, chunk_size=8 * MB,
+                 max_concurrency=4, client=None):
+        import boto3
+        from boto3.s3.transfer import TransferConfig
+
+        self.bucket = bucket
+        self.prefix = prefix
+        self.client = client or boto3.client("s3")
+        self.transfer_config = TransferConfig(
+            multipart_threshold=multipart_threshold,
+            multipart_chunksize=chunk_size,
+            max_concurrency=max_concurrency,
+        )
+
+    def url(self, key):
+        return f"s3://{self.bucket}/{self.prefix}{key}"
+
+    def upload(self, local_path, key):
+        self.client.upload_file(local_path, self.bucket, self.prefix + key, Config=self.transfer_config)
+
+def storage_from_config(config, project_root):
+    """Backend for the "storage" section of config.json, or None when uploads are off.
+
+    {"backend": "s3", "bucket": "...", "prefix": ""} or {"backend": "local", "root": "..."};
+    a relative local root is taken from the project root.
+    """
+    settings = config.get("storage", {"backend": "s3", "bucket": "phase-3-bucket"})
+    backend = (settings or {}).get("backend", "none")
+    if backend == "s3":
+        return S3Storage(
+            settings["bucket"],
+            prefix=settings.get("prefix", ""),
+            multipart_threshold=settings.get("multipart_threshold_mb", 8) * MB,
+            chunk_size=settings.get("multipart_chunk_mb", 8) * MB,
+            max_concurrency=settings.get("max_concurrency", 4),
+        )
+    if backend == "local":
+        return LocalStorage(os.path.join(project_root, settings.get("root", "Data/Uploaded")))
+    if backend == "none":
+        return None
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+# ---- background uploads ----
+def file_digest(path):
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(MB), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+class BackgroundUploader:
+    """Uploads files to a storage backend from a daemon thread.
+
+    `submit` only queues the file, so a pipeline step returns once its local
+    write is done. The queue holds at most `max_pending` files; a full queue
+    makes `submit` wait. The manifest keeps the size, mtime and sha256 of
+    the last upload of each target. A file whose size and mtime match is
+    skipped without hashing, and one whose contents hash the same is skipped
+    without uploading. Pending uploads are finished when the process exits,
+    but a backend that uploads through a thread pool (boto3 does) refuses
+    new work once interpreter shutdown has begun, so scripts should call
+    close_uploaders() before they return.
+    """
+
+    def __init__(self, storage, manifest_path, max_pending=16):
+        self.storage = storage
+        self.manifest_path = manifest_path
+        self.manifest = {}
+        if os.path.exists(manifest_path):
+            with open(manifest_path, "r") as f:
+                self.manifest = json.load(f)
+        self.stats = {"uploaded": 0, "skipped": 0, "failed": 0}
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="uploader", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, local_path, key):
+        if self._closed:
+            raise RuntimeError("Uploader is closed")
+        self._queue.put((local_path, key))
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            try:
+                self._upload(*item)
+            except Exception as e:
+                self.stats["failed"] += 1
+                print(f"✗ Upload of {item[0]} failed: {e}")
+
+    def _upload(self, local_path, key):
+        target = self.storage.url(key)
+        stat = os.stat(local_path)
+        entry = self.manifest.get(target, {})
+        if (entry.get("size"), entry.get("mtime")) == (stat.st_size, stat.st_mtime):
+            self.stats["skipped"] += 1
+            return
+        digest = file_digest(local_path)
+        if entry.get("sha256") != digest:
+            self.storage.upload(local_path, key)
+            self.stats["uploaded"] += 1
+            print(f"✓ Uploaded {os.path.basename(local_path)} to {target}")
+        else:
+            self.stats["skipped"] += 1
+        self.manifest[target] = {"size": stat.st_size, "mtime": stat.st_mtime, "sha256": digest}
+        self._save_manifest()
+
+    def _save_manifest(self):
+        with open(self.manifest_path + ".tmp", "w") as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(self.manifest_path + ".tmp", self.manifest_path)
+
+    def close(self):
+        """Finish the queued uploads and stop the thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+
+_uploaders = {}
+
+def close_uploaders():
+    """Finish every uploader's queued uploads; call before the process exits."""
+    for uploader in _uploaders.values():
+        uploader.close()
+
+def open_uploader(config, project_root):
+    """Uploader for the configured backend, or None when uploads are off.
+
+    One uploader is shared per target and manifest within a process, so
+    pipeline steps run back to back queue onto the same thread.
+    """
+    storage = storage_from_config(config, project_root)
+    if storage is None:
+        return None
+    manifest_path = os.path.join(project_root, "Data", "upload_manifest.json")
+    key = (storage.url(""), manifest_path)
+    if key not in _uploaders or _uploaders[key]._closed:
+        _uploaders[key] = BackgroundUploader(storage, manifest_path, max_pending=config.get("upload_queue_size", 16))
+    return _uploaders[key]
@@ -1,7 +1,11 @@
 from flask import Flask, request, jsonify
-import pickle
+import itertools
 import os
-import pandas as pd
+import numpy as np
+
+from model.batching import MicroBatcher
+from model.predictions import PredictionCache, PredictionTable
+from model.registry import ModelHandle, ModelRegistry
 
 # ------------------------
 # Paths & Load Model
@@ -9,11 +13,31 @@ import pandas as pd
 project_root = os.path.dirname(os.path.abspath(__file__))
 model_path = os.path.join(project_root, "model", "final_model.pkl")
 
-# Load model + feature order
-with open(model_path, "rb") as f:
-    data = pickle.load(f)
-model = data["model"]
-feature_order = data["features"]
+# "compiled" (flattened trees memory-mapped from the registry, no DataFrame)
+# or "sklearn" (unpickles the model and calls model.predict on a DataFrame)
+PREDICT_ENGINE = os.getenv("PREDICT_ENGINE", "compiled")
+# How often (seconds) to check the registry for a newly published model
+MODEL_RELOAD_SECONDS = float(os.getenv("MODEL_RELOAD_SECONDS", "5"))
+
+# Current registry version (final_model.pkl until one is published), hot reloaded
+model_handle = ModelHandle(ModelRegistry(), PREDICT_ENGINE, MODEL_RELOAD_SECONDS, fallback_path=model_path)
+
+# Largest batch /predict_batch accepts in one request
+MAX_BATCH_ROWS = int(os.getenv("MAX_BATCH_ROWS", "10000"))
+
+# Micro-batching of concurrent /predict calls: wait up to BATCH_WINDOW_MS (0 = off)
+# or until BATCH_MAX_ROWS rows are queued, then predict them together
+BATCH_WINDOW_MS = float(os.getenv("BATCH_WINDOW_MS", "0"))
+BATCH_MAX_ROWS = int(os.getenv("BATCH_MAX_ROWS", "256"))
+batcher = MicroBatcher(BATCH_WINDOW_MS, BATCH_MAX_ROWS) if BATCH_WINDOW_MS > 0 else None
+
+# LRU cache of /predict answers by model version + feature vector (0 entries = off)
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "10000"))
+PREDICTION_CACHE_TTL = float(os.getenv("PREDICTION_CACHE_TTL", "300"))
+cache = PredictionCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL) if PREDICTION_CACHE_SIZE > 0 else None
+
+# End-of-day predictions written by scripts/predict_daily.py
+prediction_table = PredictionTable()
 
 # ------------------------
 # Flask setup
@@ -24,6 +48,26 @@ app = Flask(__name__)
 def home():
     return "Stock Prediction API is running. Use POST /predict with JSON."
 
+@app.route("/model", methods=["GET"])
+def model_info():
+    serving = model_handle.get()
+    return jsonify({
+        "version": serving.version,
+        "engine": PREDICT_ENGINE,
+        "features": serving.features,
+        "batching": batcher.stats if batcher is not None else None,
+        "cache": dict(cache.stats, entries=len(cache)) if cache is not None else None,
+    })
+
+@app.route("/prediction/<symbol>", methods=["GET"])
+def stored_prediction(symbol):
+    """Precomputed end-of-day prediction for a symbol: ?date=YYYY-MM-DD, or the latest."""
+    date = request.args.get("date")
+    record = prediction_table.get(symbol, date)
+    if record is None:
+        return jsonify({"error": f"No stored prediction for {symbol.upper()}" + (f" on {date}" if date else "")}), 404
+    return jsonify(record)
+
 @app.route("/predict", methods=["POST"])
 def predict():
     data = request.get_json()
@@ -31,29 +75,184 @@ def predict():
         return jsonify({"error": "Missing 'features' in JSON request."}), 400
 
     input_dict = data["features"]
+    serving = model_handle.get()
+    feature_order = serving.features
 
-    # Convert input to DataFrame in correct feature order
+    # Convert input to a row in correct feature order; missing or null values are NaN,
+    # which the model handles as it always has
     try:
         # if input is a dict with feature names, align automatically
         if isinstance(input_dict, dict):
-            df = pd.DataFrame([input_dict], columns=feature_order)
+            row = [input_dict.get(f) for f in feature_order]
         else:  # if input is a list, assume correct order
             if len(input_dict) != len(feature_order):
                 return jsonify({"error": f"Expected {len(feature_order)} features, got {len(input_dict)}."}), 400
-            df = pd.DataFrame([input_dict], columns=feature_order)
+            row = input_dict
+        X = _to_float([row], (1, len(feature_order)))
+        if X is None:
+            return jsonify({"error": "Feature values must be numbers or null."}), 400
+        if np.isinf(X).any():
+            return jsonify({"error": "Feature values must not be infinite."}), 400
 
-        prediction = model.predict(df)[0]
+        key = cache.key(serving.version, X) if cache is not None else None
+        prediction = cache.get(key) if key is not None else None
+        if prediction is None:
+            if batcher is not None:
+                prediction = batcher.predict(serving.predict_rows, X)[0]
+            else:
+                prediction = serving.predict_rows(X)[0]
+            if key is not None:
+                cache.put(key, float(prediction))
 
     except Exception as e:
         return jsonify({"error": f"Prediction failed: {str(e)}"}), 500
 
     return jsonify({
         "input": input_dict,
-        "prediction": float(prediction)
+        "prediction": float(prediction),
+        "model_version": serving.version
+    })
+
+# ------------------------
+# Batch prediction
+# ------------------------
+def _row_values(row, feature_order):
+    """Values of one batch row in feature order; raises ValueError if the row is malformed."""
+    if isinstance(row, dict):
+        return [row.get(f) for f in feature_order]
+    if isinstance(row, list):
+        if len(row) != len(feature_order):
+            raise ValueError(f"Expected {len(feature_order)} features, got {len(row)}.")
+        return row
+    raise ValueError("Each row must be an object of features or a list in feature order.")
+
+class BatchTooLarge(ValueError):
+    pass
+
+def _check_batch_size(n_rows):
+    if n_rows > MAX_BATCH_ROWS:
+        raise BatchTooLarge(f"Batch has {n_rows} rows; the limit is {MAX_BATCH_ROWS}.")
+
+def _to_float(values, shape):
+    """float64 array of `values`, or None if they are not numbers of that shape."""
+    try:
+        array = np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        return None
+    if array.shape != shape:
+        return None
+    # JSON true/false and strings are not numbers, though NumPy reads True as 1.0 and "2.5" as 2.5
+    flat = [values] if array.ndim == 0 else values if array.ndim == 1 else itertools.chain.from_iterable(values)
+    if any(isinstance(value, (bool, str)) for value in flat):
+        return None
+    return array
+
+def _parse_rows(rows, feature_order):
+    """Feature matrix for a list of rows; returns (X, errors by row index)."""
+    _check_batch_size(len(rows))
+    X = np.full((len(rows), len(feature_order)), np.nan)
+    errors = {}
+    shaped = []
+    for i, row in enumerate(rows):
+        try:
+            shaped.append((i, _row_values(row, feature_order)))
+        except ValueError as e:
+            errors[i] = str(e)
+
+    # Convert all well-shaped rows at once; only a failure falls back to per-row
+    matrix = _to_float([values for _, values in shaped], (len(shaped), len(feature_order)))
+    if matrix is not None and shaped:
+        X[[i for i, _ in shaped]] = matrix
+    else:
+        for i, values in shaped:
+            row = _to_float(values, (len(feature_order),))
+            if row is None:
+                errors[i] = "Feature values must be numbers or null."
+            else:
+                X[i] = row
+    return X, errors
+
+def _parse_columns(columns, feature_order):
+    """Feature matrix for {feature: [values]}; returns (X, errors by row index)."""
+    missing = [f for f in feature_order if f not in columns]
+    if missing:
+        raise ValueError(f"Missing feature columns: {missing}")
+    lengths = {len(columns[f]) if isinstance(columns[f], list) else -1 for f in feature_order}
+    if len(lengths) != 1 or -1 in lengths:
+        raise ValueError("Every feature column must be a list of the same length.")
+    n_rows = lengths.pop()
+    _check_batch_size(n_rows)
+
+    X = np.empty((n_rows, len(feature_order)))
+    errors = {}
+    for j, f in enumerate(feature_order):
+        column = _to_float(columns[f], (n_rows,))
+        if column is None:
+            # Find the bad values so only their rows fail
+            column = np.full(len(X), np.nan)
+            for i, value in enumerate(columns[f]):
+                value = _to_float(value, ())
+                if value is None:
+                    errors.setdefault(i, f"Feature '{f}' must be a number or null.")
+                else:
+                    column[i] = value
+        X[:, j] = column
+    return X, errors
+
+@app.route("/predict_batch", methods=["POST"])
+def predict_batch():
+    """Predict many rows with one model call.
+
+    JSON body: {"rows": [...]} where each row is a feature dict or a list in
+    feature order, or the column form {"columns": {feature: [values, ...]}}.
+    As in /predict, a missing or null feature is NaN; strings, booleans and
+    infinities make their row fail.
+    Returns one prediction per row (null for rows that failed validation)
+    and the errors keyed by row index.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or ("rows" not in data and "columns" not in data):
+        return jsonify({"error": "Send 'rows' (list of rows) or 'columns' (feature -> list of values)."}), 400
+
+    serving = model_handle.get()
+    try:
+        if "rows" in data:
+            if not isinstance(data["rows"], list):
+                raise ValueError("'rows' must be a list.")
+            X, errors = _parse_rows(data["rows"], serving.features)
+        else:
+            if not isinstance(data["columns"], dict):
+                raise ValueError("'columns' must be an object of feature -> list of values.")
+            X, errors = _parse_columns(data["columns"], serving.features)
+    except BatchTooLarge as e:
+        return jsonify({"error": str(e)}), 413
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    for i in np.flatnonzero(np.isinf(X).any(axis=1)):
+        errors.setdefault(int(i), "Feature values must not be infinite.")
+    valid = np.array([i not in errors for i in range(len(X))], dtype=bool)
+
+    predictions = [None] * len(X)
+    if valid.any():
+        try:
+            values = serving.predict_rows(X[valid])
+        except Exception as e:
+            return jsonify({"error": f"Prediction failed: {str(e)}"}), 500
+        for i, value in zip(np.flatnonzero(valid), values):
+            predictions[i] = float(value)
+
+    return jsonify({
+        "predictions": predictions,
+        "errors": [{"row": i, "error": errors[i]} for i in sorted(errors)],
+        "n_rows": len(X),
+        "n_predicted": int(valid.sum()),
+        "model_version": serving.version,
     })
 
 # ------------------------
 # Run server
 # ------------------------
+# Development server only; in production run `gunicorn -c gunicorn.conf.py app:app`
 if __name__ == "__main__":
     app.run(debug=True)
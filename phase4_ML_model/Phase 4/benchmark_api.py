@@ -0,0 +1,71 @@
+"""Rows/sec of /predict (one row per request) vs /predict_batch.
+
+Usage: python benchmark_api.py [n_rows] [--url http://127.0.0.1:5000]
+
+Without --url the app is called in-process through Flask's test client,
+which measures the handlers without network time. With --url a running
+server is called over HTTP, so the per-request round trips are included.
+"""
+import sys
+import time
+
+import numpy as np
+
+from app import app, model_handle
+
+def make_rows(n, seed=0):
+    rng = np.random.default_rng(seed)
+    base = np.array([305.0, 300.5, 302.3, 3.5e6, 303.2, 299.8, 303.0, 300.0, 1.5, 1.5, 0.0, 1.2, 0.3, 4.0,
+                     80.0, 2.0, 1.5, 0.5, 25.0, 4.0, 15.0, 0.5, 12.0, 1.2, 2e9, 1.0, 0.05, 10.0])
+    return (base * rng.uniform(0.9, 1.1, size=(n, len(base)))).tolist()
+
+class TestClientPoster:
+    def __init__(self):
+        self.client = app.test_client()
+
+    def post(self, path, payload):
+        return self.client.post(path, json=payload).get_json()
+
+class HTTPPoster:
+    def __init__(self, url):
+        import requests
+        self.url = url.rstrip("/")
+        self.session = requests.Session()
+
+    def post(self, path, payload):
+        return self.session.post(self.url + path, json=payload).json()
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    poster = TestClientPoster()
+    if "--url" in args:
+        i = args.index("--url")
+        poster = HTTPPoster(args[i + 1])
+        del args[i:i + 2]
+    n = int(args[0]) if args else 2000
+    feature_order = model_handle.get().features
+    rows = make_rows(n)
+    columns = {f: [row[j] for row in rows] for j, f in enumerate(feature_order)}
+
+    # Warm up both paths (first model.predict call, Flask request setup)
+    poster.post("/predict", {"features": rows[0]})
+    poster.post("/predict_batch", {"rows": rows})
+
+    single_n = min(n, 500)
+    start = time.perf_counter()
+    single = [poster.post("/predict", {"features": row})["prediction"] for row in rows[:single_n]]
+    single_rate = single_n / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    batch = poster.post("/predict_batch", {"rows": rows})["predictions"]
+    rows_rate = n / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    batch_columns = poster.post("/predict_batch", {"columns": columns})["predictions"]
+    columns_rate = n / (time.perf_counter() - start)
+
+    print(f"/predict (1 row/request):     {single_rate:10,.0f} rows/sec ({single_n} requests)")
+    print(f"/predict_batch rows form:     {rows_rate:10,.0f} rows/sec ({n} rows, 1 request)")
+    print(f"/predict_batch columns form:  {columns_rate:10,.0f} rows/sec ({n} rows, 1 request)")
+    print(f"Batch matches single-row predictions: {np.allclose(single, batch[:single_n])}"
+          f" / {np.allclose(batch, batch_columns)}")
@@ -0,0 +1,51 @@
+"""Per-row latency of the sklearn path vs the compiled forest.
+
+Usage: python benchmark_inference.py [n_rows]
+
+Times `n_rows` (default 2000) single-row predictions each way and reports
+p50/p99 in microseconds. The sklearn path is the one /predict used to take:
+a one-row DataFrame and model.predict. The compiled path is
+CompiledForest.predict on a float array. It also reports batch throughput
+for both engines and checks that they agree.
+"""
+import pickle
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from model.compiled_forest import CompiledForest
+from benchmark_api import make_rows
+
+def latencies(fn, rows):
+    out = np.empty(len(rows))
+    for i, row in enumerate(rows):
+        start = time.perf_counter()
+        fn(row)
+        out[i] = time.perf_counter() - start
+    return out * 1e6
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    with open("model/final_model.pkl", "rb") as f:
+        data = pickle.load(f)
+    model, feature_order = data["model"], data["features"]
+    compiled = CompiledForest.from_sklearn(model)
+    rows = make_rows(n)
+    dict_rows = [dict(zip(feature_order, row)) for row in rows]
+
+    sklearn_us = latencies(lambda row: model.predict(pd.DataFrame([row], columns=feature_order))[0], dict_rows)
+    compiled_us = latencies(lambda row: compiled.predict(np.asarray(row))[0], rows)
+    for name, us in (("sklearn (DataFrame)", sklearn_us), ("compiled", compiled_us)):
+        print(f"{name:>20}: p50 {np.percentile(us, 50):9.1f} us   p99 {np.percentile(us, 99):9.1f} us")
+
+    X = np.asarray(rows)
+    start = time.perf_counter()
+    expected = model.predict(pd.DataFrame(X, columns=feature_order))
+    sklearn_rate = n / (time.perf_counter() - start)
+    start = time.perf_counter()
+    got = compiled.predict(X)
+    compiled_rate = n / (time.perf_counter() - start)
+    print(f"Batch of {n}: sklearn {sklearn_rate:,.0f} rows/sec, compiled {compiled_rate:,.0f} rows/sec")
+    print(f"Max abs difference from sklearn: {np.abs(expected - got).max():.3g}")
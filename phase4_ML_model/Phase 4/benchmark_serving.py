@@ -0,0 +1,111 @@
+"""/predict throughput and latency under concurrent clients, with and without micro-batching.
+
+Usage: python benchmark_serving.py [n_clients] [requests_per_client] [--gunicorn] [--url http://...]
+
+Starts the API in a child process twice, once with BATCH_WINDOW_MS=0 and
+once with batching on (BATCH_WINDOW_MS, default 2), and has `n_clients`
+(default 64) threads each send `requests_per_client` (default 20)
+single-row /predict requests over HTTP. The server is a threaded werkzeug
+server, or gunicorn with gunicorn.conf.py when --gunicorn is given. With
+--url an already running server is measured once instead.
+"""
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+import requests
+
+from benchmark_api import make_rows
+
+def run_clients(url, n_clients, per_client):
+    """Returns (requests/sec, latencies in ms)."""
+    rows = make_rows(n_clients * per_client)
+    latencies = [[] for _ in range(n_clients)]
+    barrier = threading.Barrier(n_clients + 1)
+
+    def client(i):
+        session = requests.Session()
+        session.post(url + "/predict", json={"features": rows[0]}).raise_for_status()  # connect + warm up
+        barrier.wait()
+        for row in rows[i * per_client:(i + 1) * per_client]:
+            start = time.perf_counter()
+            session.post(url + "/predict", json={"features": row}).raise_for_status()
+            latencies[i].append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(n_clients)]
+    for t in threads:
+        t.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return n_clients * per_client / elapsed, np.concatenate(latencies) * 1000
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_server(port, window_ms, use_gunicorn):
+    env = dict(os.environ, BATCH_WINDOW_MS=str(window_ms))
+    if use_gunicorn:
+        env["BIND"] = f"127.0.0.1:{port}"
+        cmd = ["gunicorn", "-c", "gunicorn.conf.py", "app:app"]
+    else:
+        cmd = [sys.executable, __file__, "--serve", str(port)]
+    server = subprocess.Popen(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(300):
+        try:
+            requests.get(url + "/", timeout=1)
+            return server, url
+        except requests.RequestException:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError("Server did not start")
+
+def serve(port):
+    from werkzeug.serving import make_server
+    from app import app
+    make_server("127.0.0.1", port, app, threaded=True).serve_forever()
+
+def report(name, rate, ms):
+    print(f"{name:>22}: {rate:8,.0f} req/sec   p50 {np.percentile(ms, 50):7.1f} ms   p99 {np.percentile(ms, 99):7.1f} ms")
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args and args[0] == "--serve":
+        serve(int(args[1]))
+        sys.exit()
+
+    use_gunicorn = "--gunicorn" in args
+    url = None
+    if "--url" in args:
+        i = args.index("--url")
+        url = args[i + 1]
+        del args[i:i + 2]
+    args = [a for a in args if a != "--gunicorn"]
+    n_clients = int(args[0]) if args else 64
+    per_client = int(args[1]) if len(args) > 1 else 20
+
+    if url:
+        report(url, *run_clients(url.rstrip("/"), n_clients, per_client))
+        sys.exit()
+
+    window_ms = float(os.getenv("BATCH_WINDOW_MS", "2"))
+    results = {}
+    for name, window in (("no batching", 0), (f"batching {window_ms:g} ms", window_ms)):
+        server, server_url = start_server(free_port(), window, use_gunicorn)
+        try:
+            results[name] = run_clients(server_url, n_clients, per_client)
+        finally:
+            server.terminate()
+            server.wait()
+        report(name, *results[name])
+    (base, _), (batched, _) = results.values()
+    print(f"{n_clients} clients: batching gives {batched / base:.1f}x the throughput")
@@ -0,0 +1,21 @@
+"""Production serving: gunicorn -c gunicorn.conf.py app:app
+
+Each worker process runs a pool of threads. Concurrent /predict calls in a
+worker are micro-batched into one model call (see model/batching.py). The
+compiled engine is the default here, so all workers memory-map the same
+registry arrays and none of them unpickles its own copy of the model.
+"""
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:5000")
+workers = int(os.getenv("WEB_CONCURRENCY", min(4, multiprocessing.cpu_count())))
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "32"))
+timeout = 30
+keepalive = 5
+
+# Batching is on by default here (the app's own default is off for the dev server)
+os.environ.setdefault("BATCH_WINDOW_MS", "2")
+os.environ.setdefault("BATCH_MAX_ROWS", "256")
+os.environ.setdefault("PREDICT_ENGINE", "compiled")
@@ -0,0 +1,90 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+class MicroBatcher:
+    """Combines concurrent prediction requests into one predictor call.
+
+    `predict` queues the caller's rows and waits. A worker thread takes the
+    first waiting request, keeps collecting for up to `window_ms` or until
+    `max_rows` rows are queued, stacks them and calls the predictor once,
+    then hands each caller its slice of the result. A caller therefore waits
+    at most the window plus one batched predict. Requests are grouped by
+    predictor, so requests that took different model snapshots (during a hot
+    reload) are never mixed.
+
+    The worker thread is started on first use in each process, so a batcher
+    created before a server forks its workers still works in the children.
+    """
+
+    def __init__(self, window_ms=2.0, max_rows=256):
+        self.window = window_ms / 1000.0
+        self.max_rows = max_rows
+        self.stats = {"requests": 0, "batches": 0, "rows": 0}
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def _ensure_worker(self):
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._queue = queue.Queue()
+                    threading.Thread(target=self._run, args=(self._queue,), name="micro-batcher", daemon=True).start()
+                    self._pid = os.getpid()
+
+    def submit(self, predict_rows, X):
+        """Future for predict_rows(X), computed as part of a batch."""
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((predict_rows, np.atleast_2d(X), future))
+        return future
+
+    def predict(self, predict_rows, X, timeout=None):
+        return self.submit(predict_rows, X).result(timeout)
+
+    def _collect(self, pending):
+        """First request plus whatever else arrives within the window, up to max_rows."""
+        batch = [pending.get()]
+        n_rows = len(batch[0][1])
+        deadline = time.monotonic() + self.window
+        while n_rows < self.max_rows:
+            remaining = deadline - time.monotonic()
+            try:
+                item = pending.get(timeout=remaining) if remaining > 0 else pending.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(item)
+            n_rows += len(item[1])
+        return batch
+
+    def _run(self, pending):
+        while True:
+            batch = self._collect(pending)
+            groups = {}
+            for item in batch:
+                groups.setdefault(id(item[0]), []).append(item)
+            for items in groups.values():
+                self._predict_group(items)
+
+    def _predict_group(self, items):
+        predict_rows = items[0][0]
+        futures = [future for _, _, future in items]
+        try:
+            X = np.concatenate([X for _, X, _ in items]) if len(items) > 1 else items[0][1]
+            values = predict_rows(X)
+        except Exception as e:
+            for future in futures:
+                future.set_exception(e)
+            return
+        start = 0
+        for _, X, future in items:
+            future.set_result(values[start:start + len(X)])
+            start += len(X)
+        self.stats["requests"] += len(items)
+        self.stats["batches"] += 1
+        self.stats["rows"] += len(values)
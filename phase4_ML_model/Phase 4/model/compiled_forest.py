@@ -0,0 +1,148 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+ENGINES = ("sklearn", "compiled")
+
+# Above this many rows sklearn's Cython tree walk beats the array version
+COMPILED_MAX_ROWS = 512
+
+def _float32_floor(threshold):
+    """Largest float32 <= each float64 threshold.
+
+    For a float32 x, `x <= t` holds exactly when `x <= _float32_floor(t)`, so
+    the comparison can run in float32 and still split like sklearn does.
+    """
+    t32 = threshold.astype(np.float32)
+    over = t32.astype(np.float64) > threshold
+    t32[over] = np.nextafter(t32[over], np.float32(-np.inf))
+    return t32
+
+class CompiledForest:
+    """A fitted forest regressor flattened into NumPy node arrays.
+
+    The nodes of every tree are stored back to back: split feature,
+    threshold, the two children (interleaved, absolute indices), where NaN
+    goes, and the leaf value. Leaves point to themselves, so all trees of
+    all rows advance together for `max_depth` steps with a handful of array
+    operations and no per-tree Python loop. Like sklearn, rows are compared
+    as float32 and the per-tree outputs are averaged in estimator order.
+    Predictions match sklearn's predict.
+    """
+
+    ARRAYS = ("feature", "threshold", "children", "missing_left", "value", "roots")
+
+    def __init__(self, feature, threshold, children, missing_left, value, roots, max_depth, n_features):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.missing_left = missing_left
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.n_features = n_features
+
+    @classmethod
+    def from_sklearn(cls, forest):
+        """Compile a fitted single-output RandomForestRegressor (or ExtraTreesRegressor)."""
+        if getattr(forest, "n_outputs_", 1) != 1:
+            raise ValueError("Only single-output forests can be compiled.")
+        parts = {name: [] for name in cls.ARRAYS}
+        offset = 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            n = tree.node_count
+            ids = np.arange(n)
+            is_leaf = tree.children_left == -1
+            # Leaves: never go right (threshold +inf) and loop back to themselves
+            left = np.where(is_leaf, ids, tree.children_left) + offset
+            right = np.where(is_leaf, ids, tree.children_right) + offset
+            missing = getattr(tree, "missing_go_to_left", np.zeros(n, dtype=np.uint8))
+            parts["feature"].append(np.where(is_leaf, 0, tree.feature))
+            parts["threshold"].append(np.where(is_leaf, np.inf, tree.threshold))
+            parts["children"].append(np.stack([left, right], axis=1).ravel())
+            parts["missing_left"].append(np.where(is_leaf, 1, missing).astype(bool))
+            parts["value"].append(tree.value[:, 0, 0])
+            parts["roots"].append([offset])
+            offset += n
+
+        arrays = {name: np.concatenate(chunks) for name, chunks in parts.items()}
+        for name in ("feature", "children", "roots"):
+            arrays[name] = arrays[name].astype(np.int32)
+        arrays["threshold"] = _float32_floor(arrays["threshold"])
+        arrays["value"] = arrays["value"].astype(np.float64)
+        max_depth = max(e.tree_.max_depth for e in forest.estimators_)
+        return cls(**arrays, max_depth=max_depth, n_features=forest.n_features_in_)
+
+    def save(self, directory):
+        """Write each node array as .npy plus forest.json with the scalar fields."""
+        os.makedirs(directory, exist_ok=True)
+        for name in self.ARRAYS:
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(directory, "forest.json"), "w") as f:
+            json.dump({"max_depth": int(self.max_depth), "n_features": int(self.n_features)}, f)
+
+    @classmethod
+    def load(cls, directory, mmap_mode="r"):
+        """Read a forest written by `save`.
+
+        With mmap_mode="r" the arrays are read-only memory maps, so every
+        process serving the same files shares one copy in the page cache.
+        """
+        arrays = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode)
+                  for name in cls.ARRAYS}
+        with open(os.path.join(directory, "forest.json"), "r") as f:
+            scalars = json.load(f)
+        return cls(**arrays, **scalars)
+
+    def predict(self, X, chunk_rows=512):
+        """Predictions for a (n_rows, n_features) array, or one row as a 1-D array."""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[None, :]
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"Expected {self.n_features} features, got {X.shape[1]}.")
+        if len(X) > chunk_rows:
+            # Small chunks keep the (trees, rows) work arrays in cache
+            return np.concatenate([self.predict(X[i:i + chunk_rows]) for i in range(0, len(X), chunk_rows)])
+
+        # Work on (trees, rows) so the final mean adds the trees in order, as sklearn does
+        n = len(X)
+        values = np.ascontiguousarray(X).ravel()
+        row_starts = np.arange(n, dtype=np.intp) * self.n_features
+        node = np.repeat(self.roots[:, None], n, axis=1)
+        has_nan = np.isnan(values).any()
+        for _ in range(self.max_depth):
+            x = np.take(values, np.take(self.feature, node) + row_starts)
+            go_right = x > np.take(self.threshold, node)
+            if has_nan:
+                go_right = np.where(np.isnan(x), ~np.take(self.missing_left, node), go_right)
+            node = np.take(self.children, 2 * node + go_right)
+        return np.take(self.value, node).mean(axis=0)
+
+def make_predictor(model, feature_order, engine="sklearn", compiled=None, max_rows=COMPILED_MAX_ROWS):
+    """Function from a (n_rows, n_features) float array in `feature_order` to predictions.
+
+    "sklearn" wraps the array in a DataFrame and calls model.predict.
+    "compiled" evaluates up to `max_rows` rows with a CompiledForest, with
+    no DataFrame, and hands larger batches to model.predict, which is
+    faster for them. With max_rows=None every batch stays on the forest and
+    `model` is never used. The forest is built from the model unless an
+    already compiled one (e.g. memory-mapped from the registry) is passed.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown prediction engine '{engine}'; choose from {ENGINES}")
+
+    def sklearn_predict(X):
+        return model.predict(pd.DataFrame(np.atleast_2d(X), columns=feature_order))
+    if engine == "sklearn":
+        return sklearn_predict
+
+    if compiled is None:
+        compiled = CompiledForest.from_sklearn(model)
+    def compiled_predict(X):
+        X = np.atleast_2d(X)
+        return compiled.predict(X) if max_rows is None or len(X) <= max_rows else sklearn_predict(X)
+    return compiled_predict
@@ -1,6 +1,12 @@
 import pickle
 
-def load_model(model_path = 'model/final_model.pkl'):
-    with open (model_path, 'rb') as f:
-        model = pickle.load(f)
-    return model
\ No newline at end of file
+from model.registry import load_current
+
+def load_model(model_path = None):
+    """{"model", "features"} from model_path, or from the registry's current version."""
+    if model_path:
+        with open (model_path, 'rb') as f:
+            model = pickle.load(f)
+        return model
+    version = load_current()
+    return {"model": version.model, "features": version.features}
@@ -0,0 +1,180 @@
+import datetime
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PREDICTION_TABLE_PATH = os.getenv("PREDICTION_TABLE_PATH",
+                                  os.path.join(PROJECT_ROOT, "predictions", "daily_predictions.db"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS predictions (
+    symbol TEXT NOT NULL,
+    date TEXT NOT NULL,
+    prediction REAL,
+    model_version TEXT,
+    created_at TEXT,
+    extra TEXT,
+    PRIMARY KEY (symbol, date)
+);
+"""
+SELECT = "date, symbol, prediction, model_version, created_at, extra"
+
+def _to_row(record):
+    """Table row for a record dict; fields outside PredictionTable.COLUMNS go to `extra` as JSON."""
+    record = dict(record)
+    symbol = str(record.pop("symbol")).upper()
+    date = pd.Timestamp(record.pop("date")).strftime("%Y-%m-%d")
+    prediction = record.pop("prediction")
+    model_version = record.pop("model_version", None)
+    created_at = record.pop("created_at", None)
+    extra = {k: v for k, v in record.items() if v is not None}
+    return (symbol, date, None if prediction is None else float(prediction),
+            None if model_version is None else str(model_version), created_at,
+            json.dumps(extra) if extra else None)
+
+def _to_record(row):
+    date, symbol, prediction, model_version, created_at, extra = row
+    record = {"date": date, "symbol": symbol, "prediction": prediction,
+              "model_version": model_version, "created_at": created_at}
+    if extra:
+        record.update(json.loads(extra))
+    return record
+
+class PredictionCache:
+    """In-process LRU cache of predictions with a time-to-live.
+
+    Keys are the model version plus a hash of the aligned float64 feature
+    row, so a dict request and a list request for the same values share an
+    entry and a newly served model never returns the old model's answers.
+    """
+
+    def __init__(self, max_entries=10000, ttl_seconds=300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "evicted": 0}
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(version, row):
+        digest = hashlib.blake2b(np.ascontiguousarray(row, dtype=np.float64).tobytes(), digest_size=16)
+        return version, digest.digest()
+
+    def get(self, key):
+        """Cached value, or None on a miss."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            value, expires = entry
+            if now >= expires:
+                del self._entries[key]
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evicted"] += 1
+
+    def __len__(self):
+        return len(self._entries)
+
+class PredictionTable:
+    """End-of-day predictions per (symbol, date), stored in SQLite.
+
+    Written by the daily batch jobs with `upsert`; a later prediction for the
+    same symbol and date replaces the earlier one. Each upsert writes only
+    its own rows in one transaction against the (symbol, date) primary key,
+    so its cost does not grow with the history. SQLite's file locking (WAL
+    mode plus a busy timeout) lets per-symbol runs write at the same time
+    without losing each other's rows. Readers look a row up by key and keep
+    the answer for `check_interval` seconds, so repeated requests for a
+    symbol do not touch the disk. Connections are opened per thread.
+
+    Fields other than COLUMNS (e.g. the batch run's timings) are kept as
+    JSON and returned alongside them. A daily_predictions.csv left next to
+    the database by the old CSV table is imported when it is first opened.
+    """
+
+    COLUMNS = ["date", "symbol", "prediction", "model_version", "created_at"]
+
+    def __init__(self, path=PREDICTION_TABLE_PATH, check_interval=5.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._recent = PredictionCache(max_entries=10000, ttl_seconds=check_interval)
+        self._local = threading.local()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            legacy_csv = os.path.splitext(self.path)[0] + ".csv"
+            if os.path.exists(legacy_csv):
+                self._import_csv(conn, legacy_csv)
+            self._local.conn = conn
+        return conn
+
+    def _import_csv(self, conn, path):
+        """Load the old CSV table into an empty database (once, even with several writers)."""
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            if conn.execute("SELECT 1 FROM predictions LIMIT 1").fetchone():
+                return
+            table = pd.read_csv(path, dtype={"date": str, "symbol": str, "model_version": str})
+            table = table.astype(object).where(table.notna(), None)
+            conn.executemany("INSERT INTO predictions VALUES (?, ?, ?, ?, ?, ?)",
+                             [_to_row(record) for record in table.to_dict("records")])
+        print(f"Imported {len(table)} predictions from {path}")
+
+    def read(self):
+        """The whole table as a DataFrame, extra fields as columns."""
+        if not os.path.exists(self.path):
+            return pd.DataFrame(columns=self.COLUMNS)
+        rows = self._conn().execute(f"SELECT {SELECT} FROM predictions ORDER BY date, symbol").fetchall()
+        return pd.DataFrame([_to_record(row) for row in rows], columns=None if rows else self.COLUMNS)
+
+    def upsert(self, records):
+        """Add or replace rows: dicts with at least date, symbol, prediction, model_version."""
+        created_at = datetime.datetime.now().isoformat(timespec="seconds")
+        rows = [_to_row(dict({"created_at": created_at}, **record)) for record in records]
+        conn = self._conn()
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def get(self, symbol, date=None):
+        """Record for `symbol` on `date` (YYYY-MM-DD), or its latest one; None if absent."""
+        key = (symbol.upper(), date)
+        record = self._recent.get(key)
+        if record is None and os.path.exists(self.path):
+            if date:
+                row = self._conn().execute(f"SELECT {SELECT} FROM predictions WHERE symbol = ? AND date = ?",
+                                           key).fetchone()
+            else:
+                row = self._conn().execute(f"SELECT {SELECT} FROM predictions WHERE symbol = ? "
+                                           "ORDER BY date DESC LIMIT 1", key[:1]).fetchone()
+            record = _to_record(row) if row else None
+            if record is not None:
+                self._recent.put(key, record)
+        return record
@@ -0,0 +1,215 @@
+import datetime
+import json
+import os
+import pickle
+import threading
+import time
+from collections import namedtuple
+
+from model.compiled_forest import COMPILED_MAX_ROWS, CompiledForest, make_predictor
+
+MODEL_DIR = os.path.dirname(os.path.abspath(__file__))
+REGISTRY_DIR = os.getenv("MODEL_REGISTRY_DIR", os.path.join(MODEL_DIR, "registry"))
+LEGACY_MODEL_PATH = os.path.join(MODEL_DIR, "final_model.pkl")
+
+class ModelVersion:
+    """One trained model: its feature order, metadata and artifacts.
+
+    The pickled sklearn model is only unpickled when something calls
+    `predict` (or reads `.model`), so a process that serves through the
+    memory-mapped compiled forest never holds a private copy of the trees.
+    """
+
+    def __init__(self, version, model_path, features, forest_dir=None, meta=None):
+        self.version = version
+        self.model_path = model_path
+        self.features = features
+        self.forest_dir = forest_dir
+        self.meta = meta or {}
+        self._model = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_pickle(cls, model_path):
+        """A version for a bare {"model", "features"} pickle such as final_model.pkl."""
+        with open(model_path, "rb") as f:
+            data = pickle.load(f)
+        version = cls(os.path.basename(model_path), model_path, data["features"])
+        version._model = data["model"]
+        return version
+
+    @property
+    def model(self):
+        with self._lock:
+            if self._model is None:
+                with open(self.model_path, "rb") as f:
+                    self._model = pickle.load(f)["model"]
+        return self._model
+
+    def predict(self, X):
+        return self.model.predict(X)
+
+    def forest(self):
+        """CompiledForest memory-mapped from the registry, or compiled from the model."""
+        if self.forest_dir:
+            return CompiledForest.load(self.forest_dir)
+        return CompiledForest.from_sklearn(self.model)
+
+    def predictor(self, engine="compiled"):
+        """Row predictor (see make_predictor) for this version.
+
+        A registry version predicts batches of any size from its memory-mapped
+        forest, so "compiled" never unpickles the model. A bare pickle is in
+        memory anyway and keeps model.predict for large batches.
+        """
+        compiled = self.forest() if engine == "compiled" else None
+        max_rows = None if self.forest_dir else COMPILED_MAX_ROWS
+        return make_predictor(self, self.features, engine, compiled=compiled, max_rows=max_rows)
+
+class ModelRegistry:
+    """Versioned model artifacts with an atomic pointer to the current one.
+
+    Layout under `root`:
+
+        CURRENT                 name of the version being served
+        <version>/model.pkl     {"model", "features"}, as final_model.pkl
+        <version>/forest/       CompiledForest arrays as .npy, for memory mapping
+        <version>/meta.json     features, metrics and creation time
+
+    A version directory is claimed with mkdir and only counts once its
+    meta.json exists, and CURRENT is swapped with os.replace, so readers
+    never see a half-written version or pointer.
+    """
+
+    def __init__(self, root=REGISTRY_DIR):
+        self.root = root
+
+    def path(self, version):
+        return os.path.join(self.root, version)
+
+    def versions(self):
+        """Complete versions, oldest first."""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(v for v in os.listdir(self.root)
+                      if os.path.exists(os.path.join(self.root, v, "meta.json")))
+
+    def current_version(self):
+        try:
+            with open(os.path.join(self.root, "CURRENT"), "r") as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def _claim_version(self):
+        os.makedirs(self.root, exist_ok=True)
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        for n in range(1000):
+            version = stamp if n == 0 else f"{stamp}-{n:03d}"
+            try:
+                os.mkdir(self.path(version))
+                return version
+            except FileExistsError:
+                continue
+        raise RuntimeError(f"Could not allocate a version directory for {stamp}")
+
+    def publish(self, model, features, metrics=None, activate=True, **info):
+        """Store a fitted forest as a new version and (by default) make it current.
+
+        Extra keyword arguments (e.g. the training watermark) go into meta.json.
+        """
+        version = self._claim_version()
+        path = self.path(version)
+        with open(os.path.join(path, "model.pkl"), "wb") as f:
+            pickle.dump({"model": model, "features": list(features)}, f)
+        forest = CompiledForest.from_sklearn(model)
+        forest.save(os.path.join(path, "forest"))
+
+        meta = {
+            "version": version,
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "features": list(features),
+            "n_estimators": len(model.estimators_),
+            "max_depth": int(forest.max_depth),
+            "metrics": metrics or {},
+            **info,
+        }
+        with open(os.path.join(path, "meta.json.tmp"), "w") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(os.path.join(path, "meta.json.tmp"), os.path.join(path, "meta.json"))
+
+        if activate:
+            self.activate(version)
+        return version
+
+    def activate(self, version):
+        """Point CURRENT at an existing version (also how to roll back)."""
+        if version not in self.versions():
+            raise ValueError(f"Unknown model version: {version}")
+        pointer = os.path.join(self.root, "CURRENT")
+        with open(pointer + ".tmp", "w") as f:
+            f.write(version + "\n")
+        os.replace(pointer + ".tmp", pointer)
+
+    def load(self, version=None):
+        """ModelVersion for `version`, or the current one."""
+        version = version or self.current_version()
+        if version is None:
+            raise LookupError(f"No current model in {self.root}")
+        path = self.path(version)
+        with open(os.path.join(path, "meta.json"), "r") as f:
+            meta = json.load(f)
+        return ModelVersion(version, os.path.join(path, "model.pkl"), meta["features"],
+                            forest_dir=os.path.join(path, "forest"), meta=meta)
+
+def load_current(registry=None, fallback_path=LEGACY_MODEL_PATH):
+    """Current registry version, or the bundled final_model.pkl if nothing is published."""
+    registry = registry or ModelRegistry()
+    if registry.current_version() is None:
+        return ModelVersion.from_pickle(fallback_path)
+    return registry.load()
+
+Serving = namedtuple("Serving", ["version", "features", "predict_rows"])
+
+class ModelHandle:
+    """The model a server is using, reloaded when the registry's CURRENT changes.
+
+    `get` returns a Serving snapshot; a request should take one snapshot and
+    use it throughout, so requests in flight during a reload finish on the
+    model they started with. At most once per `check_interval` seconds one
+    caller reads CURRENT and, if it moved, loads the new version before
+    swapping it in; other callers keep getting the old snapshot meanwhile.
+    A version that fails to load is reported and the old one kept.
+    """
+
+    def __init__(self, registry=None, engine="compiled", check_interval=1.0, fallback_path=LEGACY_MODEL_PATH):
+        self.registry = registry or ModelRegistry()
+        self.engine = engine
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._serving = self._open(load_current(self.registry, fallback_path))
+        self._next_check = time.monotonic() + check_interval
+
+    def _open(self, version):
+        return Serving(version.version, version.features, version.predictor(self.engine))
+
+    def get(self):
+        now = time.monotonic()
+        if now >= self._next_check and self._lock.acquire(blocking=False):
+            try:
+                self._next_check = now + self.check_interval
+                self.reload()
+            finally:
+                self._lock.release()
+        return self._serving
+
+    def reload(self):
+        """Switch to the registry's current version if it changed; returns the active version."""
+        version = self.registry.current_version()
+        if version is not None and version != self._serving.version:
+            try:
+                self._serving = self._open(self.registry.load(version))
+                print(f"Now serving model version {version}")
+            except Exception as e:
+                print(f"Failed to load model version {version}, still serving {self._serving.version}: {e}")
+        return self._serving.version
@@ -53,3 +53,19 @@ sample_features_list = [
 response = requests.post(url, json={"features": sample_features_list})
 print("\nList input prediction:")
 print(response.json())
+
+# --------------------------
+# 3️⃣ Batch input (many rows, one request)
+# --------------------------
+batch_url = "http://127.0.0.1:5000/predict_batch"
+
+# Rows may mix dicts and lists; invalid rows come back as errors
+response = requests.post(batch_url, json={"rows": [sample_features_dict, sample_features_list]})
+print("\nBatch prediction (rows):")
+print(response.json())
+
+# Column form: one list per feature, row i is the i-th value of every list
+columns = {name: [value, value] for name, value in sample_features_dict.items()}
+response = requests.post(batch_url, json={"columns": columns})
+print("\nBatch prediction (columns):")
+print(response.json())
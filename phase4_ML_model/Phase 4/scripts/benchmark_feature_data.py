@@ -0,0 +1,98 @@
+"""Load time and peak memory: fused CSVs vs binary feature matrices.
+
+Usage: python benchmark_feature_data.py [n_rows] [n_symbols]
+
+Writes `n_rows` (default 2,000,000) synthetic fused rows, split over
+`n_symbols` (default 50) symbols, to a temp directory in both formats. Each
+one is then loaded through feature_data in a fresh process, which reports
+its wall time and peak RSS.
+"""
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import feature_data
+
+FEATURES = ["High", "Low", "Open", "Volume", "SMA_short", "SMA_long", "EMA_short", "EMA_long",
+            "Change", "Gain", "Loss", "Avg_Gain", "Avg_Loss", "RS", "RSI", "MACD_Line",
+            "Signal_Line", "MACD_Hist", "PE_Ratio", "PB_Ratio", "ROE", "DE_Ratio", "EPS",
+            "Dividend_Yield", "Market_Cap", "Symbol", "mean_sentiment", "sentiment_count"]
+
+def write_dataset(root, n_rows, n_symbols, seed=0):
+    rng = np.random.default_rng(seed)
+    matrix_dir = os.path.join(root, "matrix")
+    per_symbol = n_rows // n_symbols
+    dates = np.datetime64("2000-01-03") + np.arange(per_symbol)
+    for i in range(n_symbols):
+        symbol = f"SYM{i:03d}"
+        values = rng.normal(100, 20, size=(per_symbol, len(FEATURES)))
+        close = values[:, 0] + rng.normal(0, 1, per_symbol)
+
+        frame = pd.DataFrame(values, columns=FEATURES)
+        frame.insert(0, "Close", close)
+        frame.insert(0, "Date", dates.astype(str))
+        frame["Symbol"] = symbol
+        frame.to_csv(os.path.join(root, f"{symbol}_fused_features.csv"), index=False)
+
+        # Same layout Phase 3 feature_matrix.FeatureMatrix writes
+        values[:, FEATURES.index("Symbol")] = np.nan
+        symbol_dir = os.path.join(matrix_dir, symbol)
+        os.makedirs(symbol_dir)
+        values.astype("<f4").tofile(os.path.join(symbol_dir, "features.bin"))
+        close.astype("<f8").tofile(os.path.join(symbol_dir, "target.bin"))
+        dates.astype("<M8[D]").tofile(os.path.join(symbol_dir, "dates.bin"))
+        with open(os.path.join(symbol_dir, "schema.json"), "w") as f:
+            json.dump({
+                "features": FEATURES, "target": "Close",
+                "dtypes": {"features": "<f4", "target": "<f8", "dates": "<M8[D]"},
+                "files": {"features": "features.bin", "target": "target.bin", "dates": "dates.bin"},
+                "n_rows": per_symbol,
+            }, f)
+    return matrix_dir
+
+def measure(root, fmt):
+    """Load one format in a child process; returns (seconds, peak RSS MB, rows)."""
+    out = subprocess.run([sys.executable, __file__, "--load", fmt, root],
+                         capture_output=True, text=True, check=True).stdout
+    seconds, rss_mb, rows = out.strip().splitlines()[-1].split()
+    return float(seconds), float(rss_mb), int(rows)
+
+def load(fmt, root):
+    feature_data.DATA_FUSED_DIR = root
+    start = time.perf_counter()
+    if fmt == "csv":
+        X, y, _ = feature_data.load_training_csv()
+    else:
+        X, y, _ = feature_data.load_training_data(os.path.join(root, "matrix"))
+    seconds = time.perf_counter() - start
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KB on Linux
+    print(f"{seconds:.3f} {rss_mb:.0f} {len(X)}")
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--load":
+        load(sys.argv[2], sys.argv[3])
+        sys.exit()
+
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    n_symbols = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    root = tempfile.mkdtemp()
+    try:
+        print(f"Writing {n_rows:,} rows for {n_symbols} symbols to {root} ...")
+        write_dataset(root, n_rows, n_symbols)
+        results = {fmt: measure(root, fmt) for fmt in ("csv", "matrix")}
+    finally:
+        shutil.rmtree(root)
+
+    for fmt, (seconds, rss_mb, rows) in results.items():
+        print(f"{fmt:>6}: {seconds:7.2f}s  peak RSS {rss_mb:7.0f} MB  ({rows:,} rows)")
+    csv_s, csv_mb, _ = results["csv"]
+    mat_s, mat_mb, _ = results["matrix"]
+    print(f"Matrix load takes {mat_s / csv_s:.1%} of the CSV time and {mat_mb / csv_mb:.1%} of its peak RSS")
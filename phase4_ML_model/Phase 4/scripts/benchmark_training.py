@@ -0,0 +1,37 @@
+"""Wall time of the walk-forward search in train_model.py for 1..N worker processes.
+
+Usage: python benchmark_training.py [n_rows] [max_workers]
+
+Runs the same small grid (4 candidates x 5 folds) on `n_rows` (default
+20,000) synthetic rows with 1, 2, 4, ... up to `max_workers` (default: all
+cores) workers and prints the speedup over one worker.
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+import train_model
+
+GRID = {"n_estimators": [50], "max_depth": [None, 12], "min_samples_leaf": [1, 5], "max_features": [1.0]}
+
+if __name__ == "__main__":
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+    rng = np.random.default_rng(0)
+    X = rng.normal(100, 20, size=(n_rows, 28)).astype(np.float32)
+    y = X[:, 0] + rng.normal(0, 1, n_rows)
+    dates = np.datetime64("2000-01-03") + np.sort(rng.integers(0, n_rows // 10, n_rows))
+    folds = train_model.walk_forward_folds(dates)
+    grid = train_model.param_grid(GRID)
+
+    counts = sorted({min(2 ** i, max_workers) for i in range(max_workers.bit_length() + 1)})
+    base = None
+    for workers in counts:
+        start = time.perf_counter()
+        train_model.run_search(X, y, folds, grid, workers=workers, verbose=False)
+        seconds = time.perf_counter() - start
+        base = base or seconds
+        print(f"{workers:3d} workers: {seconds:7.1f}s  speedup {base / seconds:4.1f}x  "
+              f"({len(grid) * len(folds)} fits on {n_rows:,} rows)")
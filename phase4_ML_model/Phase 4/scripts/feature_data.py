@@ -0,0 +1,204 @@
+import os
+import glob
+import json
+import numpy as np
+import pandas as pd
+
+# Paths – adjust according to your project structure
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_FUSED_DIR = os.path.join(PROJECT_ROOT, '..', 'Phase 3', 'Data', 'Fused')
+MATRIX_DIR = os.path.join(DATA_FUSED_DIR, 'matrix')
+LATEST_DIR = os.path.join(DATA_FUSED_DIR, 'latest')
+
+# Columns that are never model inputs
+DROP_COLS = ["Date", "symbol", "Name", "Company", "Ticker", "Unnamed: 0", 'Close']
+
+# ---- binary feature matrices (written by Phase 3 feature_fusion.py) ----
+def open_matrix(symbol_dir):
+    """Memory-map one symbol's matrix; returns (schema, features, target, dates) without copying."""
+    with open(os.path.join(symbol_dir, 'schema.json'), 'r') as f:
+        schema = json.load(f)
+    n = schema['n_rows']
+    width = {'features': len(schema['features'])}
+    arrays = {}
+    for name, file_name in schema['files'].items():
+        shape = (n, width[name]) if name in width else (n,)
+        if n == 0:
+            arrays[name] = np.empty(shape, dtype=schema['dtypes'][name])
+        else:
+            arrays[name] = np.memmap(os.path.join(symbol_dir, file_name), dtype=schema['dtypes'][name],
+                                     mode='r', shape=shape)
+    return schema, arrays['features'], arrays['target'], arrays['dates']
+
+def matrix_symbols(matrix_dir=MATRIX_DIR):
+    if not os.path.isdir(matrix_dir):
+        return []
+    return sorted(d for d in os.listdir(matrix_dir)
+                  if os.path.exists(os.path.join(matrix_dir, d, 'schema.json')))
+
+def _column_index(schema, features, symbol):
+    missing = set(features) - set(schema['features'])
+    if missing:
+        raise ValueError(f"Missing features in fused data for {symbol}: {missing}")
+    position = {name: i for i, name in enumerate(schema['features'])}
+    return [position[name] for name in features]
+
+def load_matrix(symbols=None, features=None, matrix_dir=MATRIX_DIR, fillna=0.0):
+    """Stack the matrices of `symbols` (default: all) into one float32 array.
+
+    Returns (X, y, keys, features). X is read straight from the mapped files
+    into one preallocated array, in the column order of `features` (default:
+    the first symbol's schema). NaNs are replaced with `fillna` as the CSV
+    path does; pass None to keep them. `keys` holds each row's symbol and Date.
+    """
+    symbols = [s.upper() for s in symbols] if symbols else matrix_symbols(matrix_dir)
+    opened = [(s, open_matrix(os.path.join(matrix_dir, s))) for s in symbols]
+    if features is None:
+        features = opened[0][1][0]['features'] if opened else []
+    total = sum(schema['n_rows'] for _, (schema, _, _, _) in opened)
+
+    X = np.empty((total, len(features)), dtype=np.float32)
+    y = np.empty(total, dtype=np.float64)
+    dates = np.empty(total, dtype='datetime64[D]')
+    row_symbols = np.empty(total, dtype=object)
+    start = 0
+    for symbol, (schema, feats, target, days) in opened:
+        end = start + schema['n_rows']
+        index = _column_index(schema, features, symbol)
+        if index == list(range(len(schema['features']))):
+            X[start:end] = feats
+        else:
+            X[start:end] = feats[:, index]
+        if fillna is not None:
+            block = X[start:end]
+            block[np.isnan(block)] = fillna
+        y[start:end] = target
+        dates[start:end] = days
+        row_symbols[start:end] = symbol
+        start = end
+
+    keys = pd.DataFrame({'symbol': row_symbols, 'Date': dates})
+    return X, y, keys, list(features)
+
+# ---- latest rows (Data/Fused/latest/{SYMBOL}.json, written by feature_fusion.py) ----
+def latest_symbols(latest_dir=LATEST_DIR):
+    if not os.path.isdir(latest_dir):
+        return []
+    return sorted(f[:-len('.json')] for f in os.listdir(latest_dir) if f.endswith('.json'))
+
+def read_latest_record(symbol, latest_dir=LATEST_DIR):
+    """{symbol, date, close, features} for a symbol's last fused row, or None if it has none."""
+    try:
+        with open(os.path.join(latest_dir, f"{symbol.upper()}.json"), 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def record_values(record, features):
+    """float64 array of a latest-row record's values in `features` order (nulls → 0)."""
+    values = record['features']
+    missing = set(features) - set(values)
+    if missing:
+        raise ValueError(f"Missing features in latest row for {record['symbol']}: {missing}")
+    row = np.array([values[name] for name in features], dtype=np.float64)
+    row[np.isnan(row)] = 0
+    return row
+
+def record_features(record, features=None):
+    """One-row DataFrame of a latest-row record in `features` order (nulls → 0)."""
+    features = features or list(record['features'])
+    return pd.DataFrame([record_values(record, features)], columns=features)
+
+# ---- CSV fallback ----
+def get_latest_fused_csv(stock_symbol=None):
+    # List all CSVs
+    files = [f for f in os.listdir(DATA_FUSED_DIR) if f.endswith('.csv')]
+    if stock_symbol:
+        # Feature fusion writes one {SYMBOL}_fused_features.csv per symbol
+        per_symbol = f"{stock_symbol.upper()}_fused_features.csv"
+        files = [per_symbol] if per_symbol in files else [f for f in files if stock_symbol in f]
+    if not files:
+        raise FileNotFoundError("No fused CSV files found.")
+    # Return the latest one by creation time
+    latest_file = max(files, key=lambda x: os.path.getctime(os.path.join(DATA_FUSED_DIR, x)))
+    return os.path.join(DATA_FUSED_DIR, latest_file)
+
+def _csv_features(data):
+    data = data.drop(columns=[c for c in DROP_COLS if c in data.columns])
+    # Convert all features to numeric (non-numeric → NaN → fill 0)
+    return data.apply(pd.to_numeric, errors='coerce').fillna(0)
+
+def load_training_csv():
+    # Per-symbol fused datasets, or the latest single fused file
+    fused_paths = sorted(glob.glob(os.path.join(DATA_FUSED_DIR, '*_fused_features.csv')))
+    if not fused_paths:
+        fused_paths = [get_latest_fused_csv()]
+    print(f"Loading data from: {', '.join(fused_paths)}")
+    data = pd.concat([pd.read_csv(p) for p in fused_paths], ignore_index=True)
+    if "Close" not in data.columns:
+        raise ValueError("No 'Close' column found in the dataset.")
+    keys = pd.DataFrame({
+        'symbol': data['Symbol'] if 'Symbol' in data.columns else None,
+        'Date': pd.to_datetime(data['Date'], errors='coerce'),
+    })
+    return _csv_features(data), pd.to_numeric(data["Close"], errors='coerce'), keys
+
+# ---- entry points ----
+def load_training_data(matrix_dir=MATRIX_DIR):
+    """(X, y, keys) for training: X a float32 DataFrame, y the Close prices.
+
+    Reads the binary matrices when feature fusion has written them, and
+    otherwise parses the fused CSVs.
+    """
+    if not matrix_symbols(matrix_dir):
+        return load_training_csv()
+    print(f"Loading feature matrices from: {matrix_dir}")
+    X, y, keys, features = load_matrix(matrix_dir=matrix_dir)
+    return pd.DataFrame(X, columns=features, copy=False), pd.Series(y, name="Close"), keys
+
+def load_latest(stock_symbol=None, features=None, matrix_dir=MATRIX_DIR, latest_dir=LATEST_DIR):
+    """(X, symbol, date) for a symbol's most recent row.
+
+    X is a one-row DataFrame in `features` order; `date` is the row's Date as
+    YYYY-MM-DD and `symbol` the symbol it belongs to (None if unknown). The
+    latest-row file is read when there is one, so the cost does not grow with
+    the history; otherwise the feature matrix, and last the fused CSV.
+    """
+    if stock_symbol:
+        record = read_latest_record(stock_symbol, latest_dir)
+        if record is not None:
+            return record_features(record, features), record['symbol'], record['date']
+
+    symbols = matrix_symbols(matrix_dir)
+    if stock_symbol is None and symbols:
+        # Same rule as the CSV path: the most recently written one
+        stock_symbol = max(symbols, key=lambda s: os.path.getmtime(os.path.join(matrix_dir, s, 'schema.json')))
+    if stock_symbol and stock_symbol.upper() in symbols:
+        symbol = stock_symbol.upper()
+        print(f"Loading feature matrix: {os.path.join(matrix_dir, symbol)}")
+        schema, feats, _, dates = open_matrix(os.path.join(matrix_dir, symbol))
+        if schema['n_rows'] == 0:
+            raise ValueError(f"No rows in feature matrix for {symbol}")
+        features = features or schema['features']
+        row = np.array(feats[-1:, _column_index(schema, features, symbol)])
+        row[np.isnan(row)] = 0
+        return pd.DataFrame(row, columns=features), symbol, str(dates[-1])
+
+    fused_csv = get_latest_fused_csv(stock_symbol)
+    print(f"Loading fused data: {fused_csv}")
+    data = pd.read_csv(fused_csv)
+    last = data.iloc[-1]
+    symbol = last['symbol'] if 'symbol' in data.columns else (stock_symbol.upper() if stock_symbol else None)
+    date = pd.to_datetime(last['Date']).strftime('%Y-%m-%d') if 'Date' in data.columns else None
+    latest_row = _csv_features(data).iloc[-1:]  # last row = today's features
+    if features is None:
+        return latest_row, symbol, date
+    # Ensure all features are present
+    missing_features = set(features) - set(latest_row.columns)
+    if missing_features:
+        raise ValueError(f"Missing features in fused data: {missing_features}")
+    return latest_row[features], symbol, date
+
+def load_latest_features(stock_symbol=None, features=None, matrix_dir=MATRIX_DIR, latest_dir=LATEST_DIR):
+    """One-row DataFrame with a symbol's most recent features, in `features` order."""
+    return load_latest(stock_symbol, features, matrix_dir, latest_dir)[0]
@@ -0,0 +1,109 @@
+"""Daily predictions for a whole symbol universe in one model call.
+
+Usage: python predict_batch.py [SYMBOL ...] [--workers N] [--engine sklearn|compiled]
+
+Without symbols, every symbol with fused data is scored. The latest feature
+row of each symbol is read in parallel (the latest-row files written by
+feature fusion, else the feature matrix or fused CSV), the rows are stacked
+into one array, and the current model predicts them all at once. Results go
+to the prediction table the API serves, one row per (date, symbol) with the
+model version and the run's timings.
+"""
+import argparse
+import datetime
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import feature_data
+from feature_data import load_latest, read_latest_record, record_values
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+from model.predictions import PredictionTable
+from model.registry import load_current
+
+MODEL_PATH = os.path.join(PROJECT_ROOT, 'model', 'final_model.pkl')
+PREDICT_ENGINE = os.getenv("PREDICT_ENGINE", "compiled")
+
+def universe():
+    """Every symbol with a latest-row file, feature matrix or per-symbol fused CSV."""
+    symbols = set(feature_data.latest_symbols()) | set(feature_data.matrix_symbols())
+    suffix = '_fused_features.csv'
+    symbols |= {os.path.basename(p)[:-len(suffix)] for p in glob.glob(os.path.join(feature_data.DATA_FUSED_DIR, '*' + suffix))}
+    return sorted(s.upper() for s in symbols)
+
+def latest_row(symbol, features):
+    """(values in `features` order, date) for one symbol; NaN/missing values → 0."""
+    record = read_latest_record(symbol)
+    if record is None:
+        X, _, date = load_latest(symbol, features)
+        return X.to_numpy(dtype=np.float64)[0], date
+    return record_values(record, features), record['date']
+
+def build_rows(symbols, features, workers=16):
+    """Stack the latest rows of `symbols`; returns (X, symbols, dates, errors by symbol)."""
+    def read(symbol):
+        try:
+            return symbol, latest_row(symbol, features), None
+        except Exception as e:
+            return symbol, None, str(e)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(read, symbols))
+    ok = [(s, row) for s, row, err in results if err is None]
+    errors = {s: err for s, _, err in results if err is not None}
+    X = np.array([row for _, (row, _) in ok]).reshape(len(ok), len(features))
+    return X, [s for s, _ in ok], [date for _, (_, date) in ok], errors
+
+def main(symbols=None, workers=16, engine=None):
+    run_at = datetime.datetime.now().isoformat(timespec="seconds")
+    start = time.perf_counter()
+    version = load_current(fallback_path=MODEL_PATH)
+    predict_rows = version.predictor(engine or PREDICT_ENGINE)
+    load_model_ms = (time.perf_counter() - start) * 1000
+
+    symbols = [s.upper() for s in symbols] if symbols else universe()
+    if not symbols:
+        raise FileNotFoundError(f"No fused data for any symbol in {feature_data.DATA_FUSED_DIR}")
+
+    start = time.perf_counter()
+    X, scored, dates, errors = build_rows(symbols, version.features, workers)
+    features_ms = (time.perf_counter() - start) * 1000
+    for symbol, error in errors.items():
+        print(f"✗ {symbol}: {error}")
+    if not scored:
+        raise ValueError("No symbol had usable features.")
+
+    start = time.perf_counter()
+    predictions = predict_rows(X)
+    predict_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    PredictionTable().upsert([{
+        "date": date or run_at[:10],
+        "symbol": symbol,
+        "prediction": float(prediction),
+        "model_version": version.version,
+        "run_at": run_at,
+        "features_ms": round(features_ms, 3),
+        "predict_ms": round(predict_ms, 3),
+    } for symbol, date, prediction in zip(scored, dates, predictions)])
+    write_ms = (time.perf_counter() - start) * 1000
+
+    print(f"[{run_at[:10]}] Scored {len(scored)} of {len(symbols)} symbols with model {version.version}: "
+          f"model {load_model_ms:.0f} ms, features {features_ms:.0f} ms, "
+          f"predict {predict_ms:.0f} ms, table {write_ms:.0f} ms")
+    return dict(zip(scored, predictions))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Predict the latest day for every symbol in one batch.")
+    parser.add_argument("symbols", nargs="*", help="symbols to score (default: all with fused data)")
+    parser.add_argument("--workers", type=int, default=16, help="threads reading feature rows")
+    parser.add_argument("--engine", choices=["sklearn", "compiled"], default=None)
+    args = parser.parse_args()
+    main(args.symbols, args.workers, args.engine)
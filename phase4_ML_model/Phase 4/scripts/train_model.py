@@ -1,80 +1,173 @@
 import pandas as pd
-import os, datetime, pickle
-from sklearn.model_selection import train_test_split
+import numpy as np
+import os, sys, time, itertools
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_squared_error
 from sklearn.metrics import mean_absolute_error, r2_score
 
+from feature_data import load_training_data
+
 # Paths
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-mini_project_dir = os.path.dirname(project_root)
-data_fused_dir = os.path.join(mini_project_dir, 'Phase 3', "Data", "Fused")
-
-# Load the latest fused dataset
-fused_files = [f for f in os.listdir(data_fused_dir) if f.endswith('.csv')]
-latest_fused = max(fused_files, key=lambda x: os.path.getctime(os.path.join(data_fused_dir, x)))
-fused_path = os.path.join(data_fused_dir, latest_fused)
-
-print(f"Loading data from: {fused_path}")
-data = pd.read_csv(fused_path)
-
-# Target (Close price)
-if "Close" not in data.columns:
-    raise ValueError("No 'Close' column found in the dataset.")
-y = data["Close"]
-
-# Features and target
-# Drop columns that aren't numeric or useful as predictors
-drop_cols = ["Date", "symbol", "Name", "Company", "Ticker", "Unnamed: 0", 'Close']
-data = data.drop(columns=[c for c in drop_cols if c in data.columns])
-
-# Convert everything possible to numeric and fill NaNs
-data = data.apply(pd.to_numeric, errors='coerce').fillna(0)
-y = pd.to_numeric(y, errors='coerce')
-y = y.ffill().bfill()
-
-if y.isna().sum() > 0:
-    raise ValueError("Target variable still contains NaN values after filling.")
-
-X = data  # all numeric features
-
-# Split data
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-# Model
-model = RandomForestRegressor(n_estimators=100, random_state=42)
-model.fit(X_train, y_train)
-
-# Evaluation
-preds = model.predict(X_test)
-mse = mean_squared_error(y_test, preds)
-mae = mean_absolute_error(y_test, preds)
-r2 = r2_score(y_test, preds)
-
-print(f"MAE: {mae:.4f}")
-print(f"R²: {r2:.4f}")
-print(f"Model trained successfully. MSE: {mse:.4f}")
-
-model_path = "model/final_model.pkl"
-with open(model_path, "rb") as f:
-    data = pickle.load(f)
-
-# Save model + feature order (correct)
-model_dir = os.path.join(project_root, "model")
-os.makedirs(model_dir, exist_ok=True)
-model_path = os.path.join(model_dir, "final_model.pkl")
-
-model_metadata = {
-    "model": model,
-    "features": X.columns.tolist()  # all numeric feature names in order
-}
-
-with open(model_path, "wb") as f:
-    pickle.dump(model_metadata, f)
+sys.path.append(project_root)
+from model.registry import ModelRegistry
 
-print("Model and feature order saved successfully!")
-print(f"Features expected by the model ({len(X.columns.tolist())}):")
-print(X.columns.tolist())
+LEADERBOARD_PATH = os.path.join(project_root, "model", "leaderboard.csv")
 
-
-print(f"Model saved at: {model_path}")
+# Hyperparameters tried on every walk-forward fold
+PARAM_GRID = {
+    "n_estimators": [100, 200],
+    "max_depth": [None, 12],
+    "min_samples_leaf": [1, 5],
+    "max_features": [1.0, 0.5],
+}
+N_FOLDS = 5
+# Seed of every fit; incremental updates seed their new trees from it (see update_model.py)
+RANDOM_STATE = 42
+# Share of the dates the first fold trains on; each later fold trains on everything before its test block
+MIN_TRAIN_FRACTION = 0.5
+# Worker processes for the sweep (default: all cores)
+TRAIN_WORKERS = int(os.getenv("TRAIN_WORKERS", "0")) or os.cpu_count()
+
+def param_grid(grid=None):
+    grid = grid or PARAM_GRID
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+
+def walk_forward_folds(dates, n_folds=N_FOLDS, min_train_fraction=MIN_TRAIN_FRACTION):
+    """Expanding-window folds over date-sorted rows, as (train_end, test_end) row positions.
+
+    Fold k trains on rows [0, train_end) and tests on [train_end, test_end).
+    Boundaries fall between distinct dates, so one day is never split
+    between training and testing.
+    """
+    unique = np.unique(dates)
+    if len(unique) < n_folds + 1:
+        raise ValueError(f"Need at least {n_folds + 1} distinct dates for {n_folds} folds, got {len(unique)}.")
+    first = int(len(unique) * min_train_fraction)
+    bounds = np.linspace(first, len(unique), n_folds + 1).astype(int)
+    rows = np.searchsorted(dates, unique[bounds[:-1]])
+    return [(int(rows[i]), int(rows[i + 1]) if i + 1 < n_folds else len(dates)) for i in range(n_folds)]
+
+# ---- shared memory: the workers map X and y instead of receiving pickled copies ----
+def _to_shared(array):
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[:] = array
+    return shm, (shm.name, array.shape, array.dtype.str)
+
+_shared = {}
+
+def _attach(specs):
+    for key, (name, shape, dtype) in specs.items():
+        shm = shared_memory.SharedMemory(name=name)
+        _shared[key] = (shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf))
+
+def _fit_fold(params, train_end, test_end):
+    X, y = _shared["X"][1], _shared["y"][1]
+    start = time.perf_counter()
+    model = RandomForestRegressor(random_state=RANDOM_STATE, n_jobs=1, **params)
+    model.fit(X[:train_end], y[:train_end])
+    preds = model.predict(X[train_end:test_end])
+    y_test = y[train_end:test_end]
+    return {
+        "mae": mean_absolute_error(y_test, preds),
+        "rmse": float(np.sqrt(mean_squared_error(y_test, preds))),
+        "r2": r2_score(y_test, preds),
+        "fit_seconds": time.perf_counter() - start,
+    }
+
+def run_search(X, y, folds, grid, workers=None, verbose=True):
+    """Fit every (params, fold) pair in a process pool; returns one row per pair."""
+    workers = workers or TRAIN_WORKERS
+    shared = [_to_shared(X), _to_shared(y)]
+    specs = {"X": shared[0][1], "y": shared[1][1]}
+    tasks = [(i, params, k, fold) for i, params in enumerate(grid) for k, fold in enumerate(folds)]
+    # Biggest fits first, so the pool does not end waiting on one long task
+    tasks.sort(key=lambda t: t[1].get("n_estimators", 100) * t[3][0], reverse=True)
+    results = []
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach, initargs=(specs,)) as pool:
+            futures = {pool.submit(_fit_fold, params, *fold): (i, params, k) for i, params, k, fold in tasks}
+            for done, future in enumerate(as_completed(futures), 1):
+                i, params, k = futures[future]
+                results.append({"candidate": i, "fold": k, **params, **future.result()})
+                if verbose:
+                    print(f"  [{done}/{len(tasks)}] candidate {i} fold {k}: MAE {results[-1]['mae']:.4f}")
+    finally:
+        for shm, _ in shared:
+            shm.close()
+            shm.unlink()
+    return pd.DataFrame(results)
+
+def leaderboard(results, grid):
+    """Mean and spread of the fold scores per candidate, best MAE first."""
+    names = list(grid[0])
+    board = results.groupby("candidate").agg(
+        mae=("mae", "mean"), mae_std=("mae", "std"), rmse=("rmse", "mean"),
+        r2=("r2", "mean"), fit_seconds=("fit_seconds", "sum"), folds=("fold", "count"),
+    )
+    params = pd.DataFrame(grid, columns=names, dtype=object)
+    board = params.join(board, how="right").sort_values("mae").reset_index(names="candidate")
+    board.insert(0, "rank", range(1, len(board) + 1))
+    return board
+
+def main():
+    # Load features (float32 matrices from feature fusion, or the fused CSVs) and the Close target
+    X, y, keys = load_training_data()
+    y = y.ffill().bfill()
+
+    if y.isna().sum() > 0:
+        raise ValueError("Target variable still contains NaN values after filling.")
+
+    # Walk forward in time: sort rows by date (stable, so each day keeps its symbol order)
+    features = X.columns.tolist()  # all numeric feature names in order
+    dates = pd.to_datetime(keys["Date"]).to_numpy()
+    order = np.argsort(dates, kind="stable")
+    X_sorted = np.ascontiguousarray(X.to_numpy(dtype=np.float32)[order])
+    y_sorted = np.ascontiguousarray(y.to_numpy(dtype=np.float64)[order])
+    folds = walk_forward_folds(dates[order])
+    grid = param_grid()
+
+    print(f"Walk-forward search: {len(grid)} candidates x {len(folds)} folds on {len(X_sorted)} rows, "
+          f"{TRAIN_WORKERS} workers")
+    start = time.perf_counter()
+    results = run_search(X_sorted, y_sorted, folds, grid)
+    print(f"Search finished in {time.perf_counter() - start:.1f}s")
+
+    board = leaderboard(results, grid)
+    os.makedirs(os.path.dirname(LEADERBOARD_PATH), exist_ok=True)
+    board.to_csv(LEADERBOARD_PATH, index=False)
+    print(board.head(10).to_string(index=False))
+    print(f"Leaderboard saved at: {LEADERBOARD_PATH}")
+
+    # Refit the best candidate on all rows, using every core
+    best = board.iloc[0]
+    best_params = {name: grid[int(best["candidate"])][name] for name in grid[0]}
+    model = RandomForestRegressor(random_state=RANDOM_STATE, n_jobs=-1, **best_params)
+    model.fit(pd.DataFrame(X_sorted, columns=features, copy=False), y_sorted)  # keeps feature names
+    model.set_params(n_jobs=None)  # serving predicts one row at a time
+
+    print(f"Best parameters: {best_params}")
+    print(f"MAE: {best['mae']:.4f}")
+    print(f"R²: {best['r2']:.4f}")
+    print(f"Model trained successfully. Walk-forward RMSE: {best['rmse']:.4f}")
+
+    # Publish model + feature order as a new registry version; the API picks it up without a restart
+    registry = ModelRegistry()
+    # The watermark (last trained date) and baseline MAE are what update_model.py starts from
+    version = registry.publish(model, features, metrics={
+        "mae": float(best["mae"]), "r2": float(best["r2"]), "rmse": float(best["rmse"]),
+        "cv": "walk-forward", "folds": len(folds), "params": best_params,
+    }, watermark=str(dates[order][-1])[:10], baseline_mae=float(best["mae"]), incremental_updates=0,
+       base_seed=RANDOM_STATE)
+
+    print("Model and feature order saved successfully!")
+    print(f"Features expected by the model ({len(features)}):")
+    print(features)
+
+    print(f"Model published as version {version} in {registry.path(version)}")
+
+if __name__ == "__main__":
+    main()
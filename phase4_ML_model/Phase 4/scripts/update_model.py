@@ -0,0 +1,125 @@
+"""Daily model refresh: update the current forest with the rows added since it was trained.
+
+Usage: python update_model.py [--full]
+
+The current registry version records a watermark, the last date it was
+trained on. Rows dated after it are new. They are first used to check for
+drift: if the current model's MAE on them exceeds DRIFT_RATIO times the
+walk-forward MAE of the last full retrain, train_model.py runs a full
+retrain. Otherwise the forest is updated in place of a retrain. UPDATE_TREES
+trees are fit (warm start) on the last RECENT_DAYS days, the same number of
+the oldest trees is dropped, and the result is published with the new
+watermark. A full retrain also runs when there is no watermark to start
+from, when the features changed, or after MAX_UPDATES updates in a row.
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import mean_absolute_error
+
+import train_model
+from feature_data import load_training_data
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+from model.registry import ModelRegistry
+
+# Trees replaced per update, and the window (in days) the new ones are fit on
+UPDATE_TREES = 10
+RECENT_DAYS = 250
+# Full retrain when the MAE on the new rows exceeds this multiple of the baseline
+DRIFT_RATIO = 1.5
+# The drift check needs at least this many new rows to mean anything
+DRIFT_MIN_ROWS = 20
+# Full retrain after this many incremental updates in a row
+MAX_UPDATES = 30
+
+def full_retrain(reason):
+    print(f"Full retrain: {reason}")
+    train_model.main()
+    return ModelRegistry().current_version()
+
+def check_drift(current, X_new, y_new):
+    """(drifted, recent MAE) of the current model on the new rows."""
+    baseline = current.meta.get("baseline_mae")
+    recent_mae = mean_absolute_error(y_new, current.predictor("compiled")(X_new))
+    if baseline is None or len(y_new) < DRIFT_MIN_ROWS:
+        return False, recent_mae
+    return recent_mae > DRIFT_RATIO * baseline, recent_mae
+
+def refresh_forest(model, X_window, y_window, n_trees=UPDATE_TREES, random_state=None):
+    """Fit `n_trees` new trees on the window and drop the `n_trees` oldest ones.
+
+    The new trees' seeds come from `random_state`. The forest is trimmed back
+    to its old size, so with an unchanged seed every update would grow its
+    trees from the same seeds; pass a different one per update.
+    """
+    n_before = len(model.estimators_)
+    if random_state is not None:
+        model.set_params(random_state=random_state)
+    model.set_params(warm_start=True, n_estimators=n_before + n_trees, n_jobs=-1)
+    model.fit(X_window, y_window)
+    model.estimators_ = model.estimators_[n_trees:]
+    model.set_params(warm_start=False, n_estimators=len(model.estimators_), n_jobs=None)
+    return model
+
+def main(force_full=False):
+    start = time.perf_counter()
+    registry = ModelRegistry()
+    if force_full:
+        return full_retrain("requested")
+    if registry.current_version() is None:
+        return full_retrain("no published model")
+    current = registry.load()
+    watermark = current.meta.get("watermark")
+    if watermark is None:
+        return full_retrain(f"version {current.version} has no training watermark")
+    if current.meta.get("incremental_updates", 0) >= MAX_UPDATES:
+        return full_retrain(f"{MAX_UPDATES} incremental updates since the last one")
+
+    X, y, keys = load_training_data()
+    y = y.ffill().bfill()
+    if X.columns.tolist() != current.features:
+        return full_retrain("feature columns changed")
+
+    dates = pd.to_datetime(keys["Date"]).to_numpy()
+    new = dates > np.datetime64(watermark)
+    if not new.any():
+        print(f"Model {current.version} is up to date (watermark {watermark}).")
+        return current.version
+
+    X_new = X.to_numpy(dtype=np.float32)[new]
+    drifted, recent_mae = check_drift(current, X_new, y.to_numpy()[new])
+    print(f"{int(new.sum())} new rows since {watermark}: MAE {recent_mae:.4f} "
+          f"(baseline {current.meta.get('baseline_mae')})")
+    if drifted:
+        return full_retrain(f"MAE on new rows is above {DRIFT_RATIO}x the baseline")
+
+    # Warm start on the recent window (which includes the new rows), with a fresh seed per update
+    last_date = dates.max()
+    window = dates > last_date - np.timedelta64(RECENT_DAYS, "D")
+    updates = current.meta.get("incremental_updates", 0) + 1
+    base_seed = current.meta.get("base_seed", train_model.RANDOM_STATE)
+    seed = base_seed + updates
+    model = refresh_forest(current.model, X[window], y[window], random_state=seed)
+
+    metrics = dict(current.meta.get("metrics", {}), recent_mae=float(recent_mae))
+    version = registry.publish(
+        model, current.features, metrics=metrics,
+        watermark=str(last_date)[:10],
+        baseline_mae=current.meta.get("baseline_mae"),
+        incremental_updates=updates,
+        base_seed=base_seed,
+        random_state=seed,
+        updated_from=current.version,
+    )
+    print(f"Replaced {UPDATE_TREES} of {len(model.estimators_)} trees using {int(window.sum())} rows "
+          f"from the last {RECENT_DAYS} days in {time.perf_counter() - start:.1f}s")
+    print(f"Model published as version {version} in {registry.path(version)}")
+    return version
+
+if __name__ == "__main__":
+    main(force_full="--full" in sys.argv[1:])